@@ -12,6 +12,7 @@ from backend.auth import ADMIN_SESSION_COOKIE, clear_admin_session_cookie
 from backend.logger import get_logger
 from backend.services.admin_service import AdminService
 from backend.services.admin_session_service import AdminSessionService
+from backend.utils.request_helpers import get_client_ip
 
 logger = get_logger(__name__)
 
@@ -203,7 +204,7 @@ def create_admin_blueprint(
                 return jsonify({"error": "Validation failed", "details": e.errors()}), 400
 
             # Get client IP
-            ip_address = request.remote_addr
+            ip_address = get_client_ip(request)
 
             # Perform action
             result = admin_service.change_user_role(
@@ -264,7 +265,7 @@ def create_admin_blueprint(
                 return jsonify({"error": "Validation failed", "details": e.errors()}), 400
 
             # Get client IP
-            ip_address = request.remote_addr
+            ip_address = get_client_ip(request)
 
             # Perform action
             result = admin_service.toggle_premium(
@@ -314,7 +315,7 @@ def create_admin_blueprint(
                 return jsonify({"error": "Admin service not available"}), 503
 
             # Get client IP
-            ip_address = request.remote_addr
+            ip_address = get_client_ip(request)
 
             # Perform action
             result = admin_service.reset_user_limit(
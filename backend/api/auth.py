@@ -15,6 +15,7 @@ from backend.auth import (
 from backend.logger import get_logger
 from backend.services.admin_session_service import AdminSessionService
 from backend.services.auth_service import AuthService
+from backend.utils.request_helpers import get_client_ip
 
 logger = get_logger(__name__)
 
@@ -82,7 +83,7 @@ def create_auth_blueprint(
 
         session_id = admin_session_service.create_session(
             user_id=user_id,
-            ip_address=request.remote_addr,
+            ip_address=get_client_ip(request),
             user_agent=request.headers.get("User-Agent"),
         )
         if session_id:
@@ -43,11 +43,11 @@ def create_feedback_blueprint(feedback_service: FeedbackService) -> Blueprint:
             "feedback_id": 123,
             "saved_to": "database",
             "db_saved": true,
-            "telegram_sent": true
+            "telegram_queued": true
         }
 
         Saves to database (primary) and JSON file (backup).
-        Optionally sends to Telegram if configured.
+        Optionally notifies Telegram in the background if configured.
         """
         try:
             data = request.get_json()
@@ -70,7 +70,7 @@ def create_feedback_blueprint(feedback_service: FeedbackService) -> Blueprint:
             # Get client IP
             ip_address = get_client_ip(request)
 
-            logger.info(f"Feedback submission: rating={rating}/5, ip={ip_address}")
+            logger.debug("Feedback submission: rating=%d/5, ip=%s", rating, ip_address)
 
             # Submit via service
             result = feedback_service.submit_feedback(
@@ -120,7 +120,7 @@ def create_feedback_blueprint(feedback_service: FeedbackService) -> Blueprint:
             if limit < 1 or limit > 1000:
                 return jsonify({"error": "Limit must be between 1 and 1000"}), 400
 
-            logger.info(f"Feedback list request: limit={limit}")
+            logger.debug("Feedback list request: limit=%d", limit)
 
             # Get feedback via service
             result = feedback_service.list_feedback(limit=limit)
@@ -1,16 +1,30 @@
 """Google OAuth 2.0 API endpoints."""
 
-from urllib.parse import urlencode
+from urllib.parse import quote_plus
 
-from flask import Blueprint, jsonify, make_response, redirect, request, session
+from flask import Blueprint, jsonify, make_response, redirect, request
 
 from backend.auth import set_admin_session_cookie, set_auth_cookie
 from backend.logger import get_logger
 from backend.services.admin_session_service import AdminSessionService
 from backend.services.google_auth_service import GoogleAuthService
+from backend.utils.request_helpers import get_client_ip
 
 logger = get_logger(__name__)
 
+# Redirect fragment templates (only the variable part needs escaping)
+_ERR_FRAGMENT_FMT = "google_auth_error=1&message={}"
+_OK_FRAGMENT_FMT = "google_auth_success=1&token={}"
+
+# Cookie holding the nonce of the state issued to this browser (login CSRF protection)
+_STATE_COOKIE = "google_oauth_state"
+_STATE_COOKIE_PATH = "/api/auth/google"
+
+
+def _error_redirect(message: str):
+    """Redirect to frontend with an OAuth error message in the URL hash."""
+    return redirect("/#" + _ERR_FRAGMENT_FMT.format(quote_plus(message)))
+
 
 def create_google_auth_blueprint(
     google_auth_service: GoogleAuthService, admin_session_service: AdminSessionService = None
@@ -57,15 +71,13 @@ def create_google_auth_blueprint(
                     503,  # Service Unavailable
                 )
 
-            # Generate authorization URL with state token
+            # Generate authorization URL with signed state token (CSRF protection);
+            # its nonce goes into a cookie so the callback only accepts it from this browser
             authorization_url, state = google_auth_service.generate_authorization_url()
 
-            # Store state in session for validation (CSRF protection)
-            session["google_oauth_state"] = state
-
             logger.info(f"[GOOGLE-AUTH-API] Generated auth URL (state={state[:8]}...)")
 
-            return (
+            response = make_response(
                 jsonify(
                     {
                         "success": True,
@@ -74,6 +86,17 @@ def create_google_auth_blueprint(
                 ),
                 200,
             )
+            is_localhost = request.host.startswith("localhost") or request.host.startswith("127.0.0.1")
+            response.set_cookie(
+                _STATE_COOKIE,
+                value=google_auth_service.state_nonce(state),
+                max_age=google_auth_service.STATE_TTL_SECONDS,
+                secure=not is_localhost,
+                httponly=True,
+                samesite="Lax",  # Sent on the top-level redirect back from Google
+                path=_STATE_COOKIE_PATH,
+            )
+            return response
 
         except Exception as e:
             logger.error(f"[GOOGLE-AUTH-API] Login initiation failed: {e}", exc_info=True)
@@ -102,22 +125,27 @@ def create_google_auth_blueprint(
             - Success: /?#google_auth_success&token=<jwt_token>
             - Error: /?#google_auth_error&message=<error_message>
 
-        Note: Redirects to frontend, not JSON response
+        Note: Redirects to frontend, not JSON response. The state cookie is
+        cleared on every outcome, so a state can only be used once.
         """
+        response = _handle_callback()
+        response.delete_cookie(_STATE_COOKIE, path=_STATE_COOKIE_PATH)
+        return response
+
+    def _handle_callback():
+        """Process the OAuth callback and build the redirect response."""
         try:
             # Check if Google OAuth is enabled
             if not google_auth_service.is_enabled():
                 logger.error("[GOOGLE-AUTH-API] Callback received but OAuth is disabled")
-                fragment = urlencode({"google_auth_error": "1", "message": "OAuth не настроен. Обратитесь к администратору"})
-                return redirect(f"/#{fragment}")
+                return _error_redirect("OAuth не настроен. Обратитесь к администратору")
 
             # Check for error in callback
             error = request.args.get("error")
             if error:
                 error_description = request.args.get("error_description", "Unknown error")
                 logger.warning(f"[GOOGLE-AUTH-API] OAuth error: {error} - {error_description}")
-                fragment = urlencode({"google_auth_error": "1", "message": f"{error} - {error_description}"})
-                return redirect(f"/#{fragment}")
+                return _error_redirect(f"{error} - {error_description}")
 
             # Get authorization code and state
             authorization_code = request.args.get("code")
@@ -125,31 +153,23 @@ def create_google_auth_blueprint(
 
             if not authorization_code or not state:
                 logger.error("[GOOGLE-AUTH-API] Missing code or state in callback")
-                fragment = urlencode({"google_auth_error": "1", "message": "Missing authorization code or state"})
-                return redirect(f"/#{fragment}")
+                return _error_redirect("Missing authorization code or state")
 
-            # Get expected state from session
-            expected_state = session.get("google_oauth_state")
-            if not expected_state:
-                logger.error("[GOOGLE-AUTH-API] No state found in session")
-                fragment = urlencode({"google_auth_error": "1", "message": "Invalid session state"})
-                return redirect(f"/#{fragment}")
-
-            # Clear state from session (one-time use)
-            session.pop("google_oauth_state", None)
+            # Validate signed state token against this browser's nonce (CSRF protection)
+            if not google_auth_service.verify_state(state, request.cookies.get(_STATE_COOKIE)):
+                logger.error("[GOOGLE-AUTH-API] Invalid or expired state token")
+                return _error_redirect("Invalid session state")
 
             # Handle OAuth callback: exchange code, get user info, create/login user
-            result = google_auth_service.handle_oauth_callback(
+            result = google_auth_service.handle_oauth_callback_verified(
                 authorization_code=authorization_code,
                 state=state,
-                expected_state=expected_state,
             )
 
             if not result.get("success"):
                 error_msg = result.get("error", "Authentication failed")
                 logger.error(f"[GOOGLE-AUTH-API] Authentication failed: {error_msg}")
-                fragment = urlencode({"google_auth_error": "1", "message": error_msg})
-                return redirect(f"/#{fragment}")
+                return _error_redirect(error_msg)
 
             # Get JWT token from result
             token = result.get("token")
@@ -157,8 +177,7 @@ def create_google_auth_blueprint(
 
             if not token:
                 logger.error("[GOOGLE-AUTH-API] No token in authentication result")
-                fragment = urlencode({"google_auth_error": "1", "message": "Failed to generate token"})
-                return redirect(f"/#{fragment}")
+                return _error_redirect("Failed to generate token")
 
             logger.info(
                 f"[GOOGLE-AUTH-API] User authenticated: user_id={user.get('id')}, "
@@ -166,7 +185,7 @@ def create_google_auth_blueprint(
             )
 
             # Create redirect response with auth cookie
-            fragment = urlencode({"google_auth_success": "1", "token": token})
+            fragment = _OK_FRAGMENT_FMT.format(quote_plus(token))
             response = make_response(redirect(f"/#{fragment}"))
             set_auth_cookie(response, token)
             logger.info(f"[GOOGLE-AUTH-API] Cookie set for {user.get('email')}")
@@ -174,7 +193,7 @@ def create_google_auth_blueprint(
             if admin_session_service and admin_session_service.is_available() and user.get("role") == "admin":
                 session_id = admin_session_service.create_session(
                     user_id=user["id"],
-                    ip_address=request.remote_addr,
+                    ip_address=get_client_ip(request),
                     user_agent=request.headers.get("User-Agent"),
                 )
                 if session_id:
@@ -185,14 +204,12 @@ def create_google_auth_blueprint(
         except ValueError as e:
             # Validation error (state mismatch, invalid token, etc.)
             logger.error(f"[GOOGLE-AUTH-API] Validation error: {e}")
-            fragment = urlencode({"google_auth_error": "1", "message": f"Validation failed: {str(e)}"})
-            return redirect(f"/#{fragment}")
+            return _error_redirect(f"Validation failed: {e}")
 
         except Exception as e:
             # Unexpected error
             logger.error(f"[GOOGLE-AUTH-API] Callback failed: {e}", exc_info=True)
-            fragment = urlencode({"google_auth_error": "1", "message": f"Internal error: {str(e)}"})
-            return redirect(f"/#{fragment}")
+            return _error_redirect(f"Internal error: {e}")
 
     @google_auth_bp.route("/api/auth/google/status", methods=["GET"])
     def google_status():
@@ -226,3 +243,6 @@ def create_google_auth_blueprint(
             return jsonify({"enabled": False, "configured": False, "error": str(e)}), 500
 
     return google_auth_bp
+
+
+__all__ = ["create_google_auth_blueprint"]
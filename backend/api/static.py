@@ -1,9 +1,14 @@
 """Static file serving endpoints."""
 
+import mimetypes
 import os
+import re
+import time
+from functools import lru_cache
+from typing import Optional
 
-from flask import Blueprint, jsonify, send_from_directory
-from werkzeug.utils import secure_filename
+from flask import Blueprint, Response, jsonify, request, send_from_directory
+from werkzeug.wsgi import wrap_file
 
 from backend.auth import require_admin_page
 from backend.logger import get_logger
@@ -13,9 +18,113 @@ logger = get_logger(__name__)
 # Blueprint will be created by factory function
 static_bp = Blueprint("static", __name__)
 
+# Server-generated upload/result filenames; anything else is rejected outright
+_SAFE_FILENAME = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]{0,127}")
+
+# Read size for the non-sendfile fallback of wsgi.file_wrapper
+_FILE_CHUNK_SIZE = 64 * 1024
+
+# Frontend assets that can be cached forever: only content-hashed names (e.g.
+# app.3f9a1c2b.js, logo-5d41402abc4b.png), whose URL changes with their content.
+# The current frontend files (app.js, style.css, ...) are not fingerprinted, so
+# they get _CACHE_REVALIDATE and are re-fetched only when their ETag changes.
+_IMMUTABLE_EXTS = frozenset(
+    {".js", ".css", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".woff", ".woff2", ".ttf", ".eot"}
+)
+_FINGERPRINTED_NAME = re.compile(r"[.-][0-9a-f]{8,}\.[A-Za-z0-9]+$")
+_CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+_CACHE_REVALIDATE = "no-cache, must-revalidate"
+# Result filenames are unique per generation and never rewritten
+_CACHE_RESULT = "public, max-age=3600"
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# nginx internal locations for X-Accel-Redirect (see deployment/nginx.conf)
+_ACCEL_UPLOADS_PREFIX = "/internal/uploads/"
+_ACCEL_RESULTS_PREFIX = "/internal/results/"
+
+
+@lru_cache(maxsize=2048)
+def _validated_path(folder_abs: str, filename: str) -> Optional[str]:
+    """
+    Resolve filename inside folder_abs, or None if it is unsafe.
+
+    The check only depends on its arguments (folders are fixed and the app
+    never creates symlinks in them), so repeat requests for the same file
+    skip the regex match and realpath() calls.
+
+    Args:
+        folder_abs: Real path of the serving folder
+        filename: Requested filename from the URL
+
+    Returns:
+        Absolute file path, or None on a traversal attempt / invalid name
+    """
+    if not _SAFE_FILENAME.fullmatch(filename):
+        return None
+
+    file_path = os.path.join(folder_abs, filename)
+    if os.path.commonpath([os.path.realpath(file_path), folder_abs]) != folder_abs:
+        return None
+
+    return file_path
+
+
+def _send_file(file_path: str, st: os.stat_result) -> Response:
+    """
+    Stream a file through the server's wsgi.file_wrapper.
+
+    Under gunicorn the wrapper uses sendfile(2), so file bytes never pass
+    through Python. Supports conditional (ETag/Last-Modified) and range requests.
+
+    Args:
+        file_path: Absolute path of an already validated file
+        st: Result of os.stat(file_path) (reused to avoid another stat)
+
+    Returns:
+        Response streaming the file
+    """
+    etag = f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+    # Client already has this version: answer 304 without opening the file
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        response.last_modified = st.st_mtime
+        return response
+
+    mimetype = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+
+    data = wrap_file(request.environ, open(file_path, "rb"), _FILE_CHUNK_SIZE)
+    response = Response(data, mimetype=mimetype, direct_passthrough=True)
+    response.content_length = st.st_size
+    response.last_modified = st.st_mtime
+    response.set_etag(etag, weak=True)
+
+    return response.make_conditional(request.environ, accept_ranges=True, complete_length=st.st_size)
+
+
+def _accel_redirect(internal_uri: str, filename: str) -> Response:
+    """
+    Hand a file over to nginx via X-Accel-Redirect.
+
+    nginx serves it from disk itself (sendfile, ranges, conditional
+    requests), so the worker thread is released immediately.
+
+    Args:
+        internal_uri: URI of the file in an nginx internal location
+        filename: Validated filename (for the Content-Type guess)
+
+    Returns:
+        Empty response carrying the redirect header
+    """
+    response = Response(mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+    response.headers["X-Accel-Redirect"] = internal_uri
+    return response
+
 
 def create_static_blueprint(
-    upload_folder: str, result_folder: str, frontend_folder: str
+    upload_folder: str, result_folder: str, frontend_folder: str, x_accel_redirect: bool = False
 ) -> Blueprint:
     """
     Factory function to create static file blueprint with injected dependencies.
@@ -24,10 +133,14 @@ def create_static_blueprint(
         upload_folder: Path to uploads folder
         result_folder: Path to results folder
         frontend_folder: Path to frontend build folder
+        x_accel_redirect: Serve uploads/results through nginx X-Accel-Redirect
 
     Returns:
         Configured Blueprint
     """
+    # Resolved once: folders are fixed for the lifetime of the app
+    upload_folder_abs = os.path.realpath(upload_folder)
+    result_folder_abs = os.path.realpath(result_folder)
 
     @static_bp.route("/uploads/<path:filename>", methods=["GET"])
     def serve_upload(filename):
@@ -38,21 +151,23 @@ def create_static_blueprint(
         """
         try:
             # Security: prevent directory traversal
-            filename = secure_filename(filename)
-            file_path = os.path.join(upload_folder, filename)
-
-            # Additional security check
-            if not os.path.abspath(file_path).startswith(os.path.abspath(upload_folder)):
-                logger.warning(f"Security check failed for: {filename}")
+            file_path = _validated_path(upload_folder_abs, filename)
+            if file_path is None:
+                logger.warning(f"Security check failed for: {filename!r}")
                 return jsonify({"error": "Invalid file path"}), 403
 
-            if not os.path.exists(file_path):
+            if x_accel_redirect:
+                return _accel_redirect(_ACCEL_UPLOADS_PREFIX + filename, filename)
+
+            try:
+                st = os.stat(file_path)
+            except FileNotFoundError:
                 logger.warning(f"File not found: {filename}")
                 return jsonify({"error": "File not found"}), 404
 
-            logger.info(f"Serving upload: {filename} ({os.path.getsize(file_path)} bytes)")
+            logger.debug("Serving upload: %s (%d bytes)", filename, st.st_size)
 
-            return send_from_directory(upload_folder, filename)
+            return _send_file(file_path, st)
 
         except Exception as e:
             logger.error(f"Error serving upload {filename}: {e}", exc_info=True)
@@ -61,25 +176,31 @@ def create_static_blueprint(
     @static_bp.route("/api/result/<filename>", methods=["GET"])
     def get_result(filename):
         """
-        Retrieve result image.
+        Retrieve result image (cacheable, see _CACHE_RESULT).
         """
         try:
             # Security: prevent directory traversal
-            filename = secure_filename(filename)
-            file_path = os.path.join(result_folder, filename)
-
-            # Additional security check
-            if not os.path.abspath(file_path).startswith(os.path.abspath(result_folder)):
-                logger.warning(f"Security check failed for result: {filename}")
+            file_path = _validated_path(result_folder_abs, filename)
+            if file_path is None:
+                logger.warning(f"Security check failed for result: {filename!r}")
                 return jsonify({"error": "Invalid file path"}), 403
 
-            if not os.path.exists(file_path):
+            if x_accel_redirect:
+                response = _accel_redirect(_ACCEL_RESULTS_PREFIX + filename, filename)
+                response.headers["Cache-Control"] = _CACHE_RESULT
+                return response
+
+            try:
+                st = os.stat(file_path)
+            except FileNotFoundError:
                 logger.warning(f"Result file not found: {filename}")
                 return jsonify({"error": "Result not found"}), 404
 
-            logger.info(f"Serving result: {filename} ({os.path.getsize(file_path)} bytes)")
+            logger.debug("Serving result: %s (%d bytes)", filename, st.st_size)
 
-            return send_from_directory(result_folder, filename)
+            response = _send_file(file_path, st)
+            response.headers["Cache-Control"] = _CACHE_RESULT
+            return response
 
         except Exception as e:
             logger.error(f"Error serving result {filename}: {e}", exc_info=True)
@@ -92,7 +213,7 @@ def create_static_blueprint(
         """
         try:
             response = send_from_directory(frontend_folder, "index.html")
-            response.headers["Cache-Control"] = "no-cache, must-revalidate"
+            response.headers["Cache-Control"] = _CACHE_REVALIDATE
             return response
         except Exception as e:
             logger.error(f"Error serving frontend: {e}", exc_info=True)
@@ -156,12 +277,10 @@ def create_static_blueprint(
             response = send_from_directory(frontend_folder, path)
 
             # Add caching headers for static assets
-            if path.endswith(
-                (".js", ".css", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".woff", ".woff2", ".ttf", ".eot")
-            ):
-                response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+            if os.path.splitext(path)[1].lower() in _IMMUTABLE_EXTS and _FINGERPRINTED_NAME.search(path):
+                response.headers["Cache-Control"] = _CACHE_IMMUTABLE
             else:
-                response.headers["Cache-Control"] = "no-cache, must-revalidate"
+                response.headers["Cache-Control"] = _CACHE_REVALIDATE
 
             return response
 
@@ -169,7 +288,7 @@ def create_static_blueprint(
             # If file not found, serve index.html (SPA fallback)
             try:
                 response = send_from_directory(frontend_folder, "index.html")
-                response.headers["Cache-Control"] = "no-cache, must-revalidate"
+                response.headers["Cache-Control"] = _CACHE_REVALIDATE
                 return response
             except Exception as e:
                 logger.error(f"Error serving static file {path}: {e}", exc_info=True)
@@ -179,9 +298,10 @@ def create_static_blueprint(
     def health_check():
         """
         Health check endpoint.
-        """
-        import time
 
-        return jsonify({"status": "healthy", "timestamp": time.time()}), 200
+        Hit frequently by load balancers, so the body is formatted directly
+        instead of going through jsonify.
+        """
+        return b'{"status":"healthy","timestamp":%.3f}' % time.time(), 200, _JSON_HEADERS
 
     return static_bp
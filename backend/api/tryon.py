@@ -1,7 +1,7 @@
 """Virtual try-on API endpoints."""
 
 import os
-from typing import Optional
+from typing import Optional, Tuple
 
 from flask import Blueprint, jsonify, request
 
@@ -14,6 +14,26 @@ logger = get_logger(__name__)
 # Blueprint will be created by factory function
 tryon_bp = Blueprint("tryon", __name__)
 
+# Static error payloads (built once; jsonify per request since responses are mutable)
+_ERR_FINGERPRINT_REQUIRED = {"error": "device_fingerprint required"}
+_ERR_ANON_FINGERPRINT_REQUIRED = {
+    "error": "DEVICE_FINGERPRINT_REQUIRED",
+    "message": "Обновите страницу или включите JavaScript, чтобы мы могли проверить бесплатный лимит.",
+}
+_ERR_LIMIT_EXCEEDED = {
+    "error": "LIMIT_EXCEEDED",
+    "message": "Вы исчерпали дневной лимит генераций. Перейдите на Premium для безлимитного доступа!",
+}
+_ERR_ANON_LIMIT_EXCEEDED = {
+    "error": "ANON_LIMIT_EXCEEDED",
+    "message": "Вы использовали все бесплатные генерации. Зарегистрируйтесь, чтобы продолжить.",
+}
+
+
+def _client_info() -> Tuple[str, str]:
+    """Return (client_ip, user_agent) of the current request."""
+    return get_client_ip(request), request.headers.get("User-Agent", "")
+
 
 def create_tryon_blueprint(tryon_service: TryonService, auth_service=None) -> Blueprint:
     """
@@ -40,6 +60,10 @@ def create_tryon_blueprint(tryon_service: TryonService, auth_service=None) -> Bl
             "device_fingerprint": "abc123"  // required for anonymous users
         }
 
+        Query parameters:
+            inline: "1" to include the base64 "result_image" in each result
+                    (omitted by default - fetch /api/result/<result_filename>)
+
         Response:
         {
             "success": true,
@@ -47,7 +71,7 @@ def create_tryon_blueprint(tryon_service: TryonService, auth_service=None) -> Bl
                 {
                     "original": "person_1.jpg",
                     "result_path": "/results/result_1.jpg",
-                    "result_image": "data:image/png;base64,...",
+                    "result_image": "data:image/png;base64,...",  // only with ?inline=1
                     "result_url": "https://domain/api/result/result_1.jpg",
                     "result_filename": "result_1.jpg"
                 }
@@ -63,7 +87,7 @@ def create_tryon_blueprint(tryon_service: TryonService, auth_service=None) -> Bl
         Authentication is optional - allows 3 free generations without login.
         """
         try:
-            data = request.get_json()
+            data = request.get_json(silent=True, cache=False)
             if not data:
                 return jsonify({"error": "Missing request body"}), 400
 
@@ -93,19 +117,10 @@ def create_tryon_blueprint(tryon_service: TryonService, auth_service=None) -> Bl
 
             # For anonymous users, require device fingerprint
             if not user_id and not device_fingerprint:
-                return (
-                    jsonify(
-                        {
-                            "error": "DEVICE_FINGERPRINT_REQUIRED",
-                            "message": "Обновите страницу или включите JavaScript, чтобы мы могли проверить бесплатный лимит.",
-                        }
-                    ),
-                    400,
-                )
+                return jsonify(_ERR_ANON_FINGERPRINT_REQUIRED), 400
 
             # Get client info for anonymous users
-            client_ip = get_client_ip(request) if not user_id else None
-            user_agent = request.headers.get("User-Agent", "") if not user_id else None
+            client_ip, user_agent = _client_info() if not user_id else (None, None)
 
             logger.info(
                 f"Try-on request: {len(person_images)} images, category={garment_category}, "
@@ -123,6 +138,7 @@ def create_tryon_blueprint(tryon_service: TryonService, auth_service=None) -> Bl
                     ip_address=client_ip,
                     user_agent=user_agent,
                     request_obj=request,
+                    inline_result=request.args.get("inline") == "1",
                 )
 
                 return jsonify(result), 200
@@ -132,26 +148,7 @@ def create_tryon_blueprint(tryon_service: TryonService, auth_service=None) -> Bl
 
                 # Handle limit exceeded errors
                 if "LIMIT_EXCEEDED" in error_msg:
-                    if user_id:
-                        return (
-                            jsonify(
-                                {
-                                    "error": "LIMIT_EXCEEDED",
-                                    "message": "Вы исчерпали дневной лимит генераций. Перейдите на Premium для безлимитного доступа!",
-                                }
-                            ),
-                            403,
-                        )
-                    else:
-                        return (
-                            jsonify(
-                                {
-                                    "error": "ANON_LIMIT_EXCEEDED",
-                                    "message": "Вы использовали все бесплатные генерации. Зарегистрируйтесь, чтобы продолжить.",
-                                }
-                            ),
-                            403,
-                        )
+                    return jsonify(_ERR_LIMIT_EXCEEDED if user_id else _ERR_ANON_LIMIT_EXCEEDED), 403
 
                 # Other validation errors
                 return jsonify({"error": error_msg}), 400
@@ -179,14 +176,13 @@ def create_tryon_blueprint(tryon_service: TryonService, auth_service=None) -> Bl
         }
         """
         try:
-            data = request.get_json()
+            data = request.get_json(silent=True, cache=False) or {}
             device_fingerprint = data.get("device_fingerprint")
 
             if not device_fingerprint:
-                return jsonify({"error": "device_fingerprint required"}), 400
+                return jsonify(_ERR_FINGERPRINT_REQUIRED), 400
 
-            client_ip = get_client_ip(request)
-            user_agent = request.headers.get("User-Agent", "")
+            client_ip, user_agent = _client_info()
 
             logger.info(f"Device limit check: fingerprint={device_fingerprint[:16]}..., ip={client_ip}")
 
@@ -220,14 +216,13 @@ def create_tryon_blueprint(tryon_service: TryonService, auth_service=None) -> Bl
         }
         """
         try:
-            data = request.get_json()
+            data = request.get_json(silent=True, cache=False) or {}
             device_fingerprint = data.get("device_fingerprint")
 
             if not device_fingerprint:
-                return jsonify({"error": "device_fingerprint required"}), 400
+                return jsonify(_ERR_FINGERPRINT_REQUIRED), 400
 
-            client_ip = get_client_ip(request)
-            user_agent = request.headers.get("User-Agent", "")
+            client_ip, user_agent = _client_info()
 
             logger.info(f"Device limit increment: fingerprint={device_fingerprint[:16]}..., ip={client_ip}")
 
@@ -1,19 +1,49 @@
 """File upload and validation API endpoints."""
 
+import itertools
 import os
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List
 
 from flask import Blueprint, jsonify, request
-from werkzeug.utils import secure_filename
 
 from backend.logger import get_logger
 from backend.services.image_service import ImageService
+from backend.utils.file_helpers import save_uploaded_file
 
 logger = get_logger(__name__)
 
 # Blueprint will be created by factory function
 upload_bp = Blueprint("upload", __name__)
 
+# Upload ids: per-process prefix (start time + pid) and a counter, so ids are unique
+# across requests in the same second, across gunicorn workers and across restarts
+_UPLOAD_ID_PREFIX = f"{int(time.time()):x}-{os.getpid():x}"
+_upload_counter = itertools.count()
+
+# Shared pool for image quality checks + preprocessing. Pillow releases the GIL while
+# decoding, resizing and encoding, so threads use all cores without process overhead.
+_VALIDATE_POOL = ThreadPoolExecutor(max_workers=max(2, os.cpu_count() or 1), thread_name_prefix="ImageValidate")
+
+
+def _next_upload_id() -> str:
+    """Return a collision-free id for an upload batch (used in filenames and as session_id)."""
+    return f"{_UPLOAD_ID_PREFIX}-{next(_upload_counter):x}"
+
+
+def _collect_validation_warnings(person_futures: List[Future], garment_future: Future) -> Dict[str, list]:
+    """Build validation_warnings payload from completed validation futures."""
+    person_warnings = []
+    for idx, future in enumerate(person_futures):
+        _, _, warnings = future.result()
+        if warnings:
+            person_warnings.append({"image_index": idx, "warnings": warnings})
+
+    _, _, garment_warnings = garment_future.result()
+
+    return {"person_images": person_warnings, "garment_image": garment_warnings}
+
 
 def create_upload_blueprint(image_service: ImageService, upload_folder: str) -> Blueprint:
     """
@@ -56,24 +86,10 @@ def create_upload_blueprint(image_service: ImageService, upload_folder: str) ->
             if not image_file or not image_service.validate_file(image_file.filename):
                 return jsonify({"error": "Invalid image file"}), 400
 
-            # Save temporarily for validation
-            timestamp = int(time.time())
-            extension = image_file.filename.rsplit(".", 1)[1].lower()
-            filename = secure_filename(f"temp_validate_{timestamp}.{extension}")
-            filepath = os.path.join(upload_folder, filename)
-
-            image_file.save(filepath)
-
-            logger.info(f"Validating image: {filename}")
+            logger.debug("Validating image: %s", image_file.filename)
 
-            # Validate image quality
-            is_valid, warnings = image_service.validate_image_quality(filepath)
-
-            # Clean up temp file
-            try:
-                os.remove(filepath)
-            except Exception as e:
-                logger.warning(f"Failed to remove temp file {filepath}: {e}")
+            # Validate image quality straight from the upload stream (no temp file)
+            is_valid, warnings = image_service.validate_image_quality_stream(image_file.stream)
 
             return jsonify({"success": True, "is_valid": is_valid, "warnings": warnings}), 200
 
@@ -90,12 +106,15 @@ def create_upload_blueprint(image_service: ImageService, upload_folder: str) ->
         - person_images[]: 1-4 person images
         - garment_image: 1 garment image
 
+        All images are validated and preprocessed concurrently (the optimized
+        files are reused by /api/tryon), and the warnings are returned here.
+
         Response:
         {
             "success": true,
             "person_images": ["/path/to/person1.jpg", "/path/to/person2.jpg"],
             "garment_image": "/path/to/garment.jpg",
-            "session_id": 1234567890,
+            "session_id": "6712f0a1-3f2c-0",
             "validation_warnings": {
                 "person_images": [
                     {
@@ -122,64 +141,55 @@ def create_upload_blueprint(image_service: ImageService, upload_folder: str) ->
             if len(person_files) < 1 or len(person_files) > 4:
                 return jsonify({"error": "Please upload 1-4 person images"}), 400
 
-            logger.info(f"Upload request: {len(person_files)} person images, 1 garment image")
+            logger.debug("Upload request: %d person images, 1 garment image", len(person_files))
 
             # Validate and save files
             person_paths = []
-            person_warnings = []
-            timestamp = int(time.time())
+            upload_id = _next_upload_id()
 
             for idx, person_file in enumerate(person_files):
-                if not person_file or not image_service.validate_file(person_file.filename):
+                extension = person_file and image_service.allowed_extension(person_file.filename)
+                if not extension:
                     return jsonify({"error": f"Invalid person image file: {person_file.filename}"}), 400
 
-                # Save person image
-                extension = person_file.filename.rsplit(".", 1)[1].lower()
-                filename = secure_filename(f"person_{timestamp}_{idx}.{extension}")
+                # Save person image (extension is whitelisted, the rest of the name is ours)
+                filename = f"person_{upload_id}_{idx}.{extension}"
                 filepath = os.path.join(upload_folder, filename)
 
-                person_file.save(filepath)
+                save_uploaded_file(person_file, filepath)
                 person_paths.append(filepath)
 
-                logger.info(f"Saved person image: {filename}")
-
-                # Validate image quality
-                is_valid, warnings = image_service.validate_image_quality(filepath)
-
-                if warnings:
-                    person_warnings.append({"image_index": idx, "warnings": warnings})
+                logger.debug("Saved person image: %s", filename)
 
             # Validate and save garment image
-            if not garment_file or not image_service.validate_file(garment_file.filename):
+            garment_extension = garment_file and image_service.allowed_extension(garment_file.filename)
+            if not garment_extension:
                 return jsonify({"error": "Invalid garment image file"}), 400
 
-            garment_extension = garment_file.filename.rsplit(".", 1)[1].lower()
-            garment_filename = secure_filename(f"garment_{timestamp}.{garment_extension}")
+            garment_filename = f"garment_{upload_id}.{garment_extension}"
             garment_path = os.path.join(upload_folder, garment_filename)
 
-            garment_file.save(garment_path)
+            save_uploaded_file(garment_file, garment_path)
 
-            logger.info(f"Saved garment image: {garment_filename}")
+            logger.debug("Saved garment image: %s", garment_filename)
 
-            # Validate garment image
-            is_valid, garment_warnings = image_service.validate_image_quality(garment_path)
+            # Validate and preprocess all images concurrently with one decode per image
+            # (the optimized files are reused by /api/tryon)
+            person_futures = [_VALIDATE_POOL.submit(image_service.analyze_and_preprocess, p) for p in person_paths]
+            garment_future = _VALIDATE_POOL.submit(image_service.analyze_and_preprocess, garment_path)
 
-            # Build response
-            response_data = {
-                "success": True,
-                "person_images": person_paths,
-                "garment_image": garment_path,
-                "session_id": timestamp,
-            }
-
-            # Add warnings if any
-            if person_warnings or garment_warnings:
-                response_data["validation_warnings"] = {
-                    "person_images": person_warnings,
-                    "garment_image": garment_warnings,
-                }
-
-            return jsonify(response_data), 200
+            return (
+                jsonify(
+                    {
+                        "success": True,
+                        "person_images": person_paths,
+                        "garment_image": garment_path,
+                        "session_id": upload_id,
+                        "validation_warnings": _collect_validation_warnings(person_futures, garment_future),
+                    }
+                ),
+                200,
+            )
 
         except Exception as e:
             logger.error(f"File upload failed: {e}", exc_info=True)
@@ -1,15 +1,119 @@
 """API endpoints for user's try-on history."""
 
+from datetime import datetime
 from functools import wraps
 
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, g, jsonify, request
+from psycopg2.errors import UndefinedTable
 
 from backend.auth import AuthManager, get_token_from_request
 from backend.logger import get_logger
 from backend.repositories.generation_repository import GenerationRepository
+from backend.utils.cache_helpers import TTLCache, user_stats_cache
+from backend.utils.db_helpers import execute_prepared, get_db_connection, put_db_connection
 
 logger = get_logger(__name__)
 
+# Validated tokens are reused for up to this long, so role/premium changes
+# and revocations take effect within this window
+_TOKEN_CACHE_TTL_SECONDS = 30
+
+# Deeper pages must use the keyset cursor (OFFSET scans and discards every skipped row)
+_MAX_OFFSET = 1000
+
+# Maximum items accepted by PATCH /api/user/tryons/bulk
+_MAX_BULK_ITEMS = 100
+
+# Hot queries, run as server-side prepared statements (see execute_prepared).
+# Listing columns are in _TRYON_COLUMNS order, with coercions done by the database,
+# and match idx_generations_user_completed (status is implied by its WHERE clause), so
+# the listing is an index-only scan that stops after LIMIT rows (callers ask for one
+# extra row to detect has_more); (created_at, id) ordering keeps pages stable for equal
+# timestamps.
+# {where} is _TRYONS_WHERE or _FAVORITES_WHERE ({column} picks the matching total);
+# the favorites filter is a literal predicate (not a parameter) so the planner can use
+# idx_generations_user_favorites.
+_TRYON_COLUMNS = (
+    "id", "category", "person_image", "garment_image", "result_url", "thumbnail_url",
+    "title", "is_favorite", "status", "created_at", "updated_at",
+)
+_TRYONS_WHERE = "user_id = $1 AND status = 'completed'"
+_FAVORITES_WHERE = _TRYONS_WHERE + " AND is_favorite"
+
+_SQL_TRYONS_AFTER = """
+    SELECT id, category, person_image_url, garment_image_url,
+           COALESCE(NULLIF(result_r2_url, ''), result_image_url), thumbnail_url,
+           title, COALESCE(is_favorite, FALSE), 'completed', created_at, updated_at
+    FROM generations
+    WHERE {where}
+      AND (created_at, id) < ($2::timestamp, $3)
+    ORDER BY created_at DESC, id DESC
+    LIMIT $4
+"""
+
+_SQL_TRYONS_OFFSET = """
+    SELECT id, category, person_image_url, garment_image_url,
+           COALESCE(NULLIF(result_r2_url, ''), result_image_url), thumbnail_url,
+           title, COALESCE(is_favorite, FALSE), 'completed', created_at, updated_at
+    FROM generations
+    WHERE {where}
+    ORDER BY created_at DESC, id DESC
+    LIMIT $2 OFFSET $3
+"""
+
+# Listing total from the trigger-maintained summary rows (migration 010): a few rows
+# per user instead of counting every matching generation
+_SQL_TRYONS_TOTAL = """
+    SELECT COALESCE(SUM({column}), 0)
+    FROM user_category_stats
+    WHERE user_id = $1
+"""
+
+# Fallback total while user_category_stats doesn't exist yet (migration 010 pending)
+_SQL_TRYONS_COUNT = """
+    SELECT COUNT(*)
+    FROM generations
+    WHERE {where}
+"""
+
+# Prepared statement name -> SQL, keyed by (kind, favorites_only)
+_TRYONS_STATEMENTS = {
+    (kind, favorites_only): (
+        f"tryons_{kind}_fav" if favorites_only else f"tryons_{kind}",
+        sql.format(
+            where=_FAVORITES_WHERE if favorites_only else _TRYONS_WHERE,
+            column="favorite_count" if favorites_only else "completed_count",
+        ),
+    )
+    for kind, sql in (
+        ("after", _SQL_TRYONS_AFTER),
+        ("offset", _SQL_TRYONS_OFFSET),
+        ("total", _SQL_TRYONS_TOTAL),
+        ("count", _SQL_TRYONS_COUNT),
+    )
+    for favorites_only in (False, True)
+}
+
+# Per-category summary rows maintained by the trg_generations_stats trigger
+# (migration 010); a NULL category is stored as ''
+_SQL_TRYONS_STATS = """
+    SELECT category, completed_count, favorite_count, storage_bytes
+    FROM user_category_stats
+    WHERE user_id = $1
+"""
+
+# Same rows aggregated from generations, used while user_category_stats doesn't exist
+# yet (migration 010 pending). Storage counts every status, like the trigger does.
+_SQL_TRYONS_STATS_AGGREGATE = """
+    SELECT COALESCE(category, ''),
+           COUNT(*) FILTER (WHERE status = 'completed'),
+           COUNT(*) FILTER (WHERE status = 'completed' AND is_favorite),
+           COALESCE(SUM(r2_upload_size), 0)
+    FROM generations
+    WHERE user_id = $1
+    GROUP BY category
+"""
+
 
 def create_user_tryons_blueprint(auth_manager: AuthManager) -> Blueprint:
     """
@@ -23,17 +127,37 @@ def create_user_tryons_blueprint(auth_manager: AuthManager) -> Blueprint:
     """
     user_tryons_bp = Blueprint("user_tryons", __name__)
 
+    # Successful validate_token() results by token; failures are never cached, so a
+    # transient database error doesn't turn into 401s for the rest of the TTL
+    token_cache = TTLCache(ttl_seconds=_TOKEN_CACHE_TTL_SECONDS)
+
+    def _validate_token_cached(token):
+        """validate_token(), memoized for _TOKEN_CACHE_TTL_SECONDS when it returns a user."""
+        user = token_cache.get(token)
+        if user is None:
+            user = auth_manager.validate_token(token)
+            if user:
+                token_cache.set(token, user)
+        return user
+
     def require_auth(f):
         """Decorator to require valid JWT token."""
         @wraps(f)
         def wrapper(*args, **kwargs):
-            token = get_token_from_request()
-            if not token:
-                return jsonify({"error": "Authorization required"}), 401
+            # Already validated earlier in this request
+            user = g.get("current_user")
+            if user is None:
+                token = get_token_from_request()
+                if not token:
+                    return jsonify({"error": "Authorization required"}), 401
 
-            user = auth_manager.validate_token(token)
-            if not user:
-                return jsonify({"error": "Invalid or expired token"}), 401
+                user = _validate_token_cached(token)
+                if not user:
+                    return jsonify({"error": "Invalid or expired token"}), 401
+
+                # Copy so handlers can't mutate the cached entry
+                user = dict(user)
+                g.current_user = user
 
             return f(user, *args, **kwargs)
         return wrapper
@@ -41,72 +165,84 @@ def create_user_tryons_blueprint(auth_manager: AuthManager) -> Blueprint:
     @user_tryons_bp.route("/api/user/tryons", methods=["GET"])
     @require_auth
     def get_user_tryons(user):
-        """Get user's try-on history."""
+        """
+        Get user's try-on history.
+
+        Query parameters:
+            limit: Page size (max 100, default 50)
+            after_created_at, after_id: Keyset cursor from the previous page's
+                "next_cursor" (index seek, cost independent of page depth)
+            offset: Legacy offset pagination, used when no cursor is given (max 1000)
+            favorites: "1" to only return favorites
+
+        Response includes "next_cursor" ({"after_created_at", "after_id"} or null)
+        and "total", the overall count (of favorites when filtered).
+        """
         try:
             user_id = user.get("id")
             if not user_id:
                 return jsonify({"error": "Invalid user"}), 401
 
-            limit = request.args.get("limit", 50, type=int)
-            offset = request.args.get("offset", 0, type=int)
+            args = request.args
+            after_created_at = args.get("after_created_at")
+            favorites_only = args.get("favorites") == "1"
+            try:
+                limit = int(args.get("limit", 50))
+                offset = int(args.get("offset", 0))
+                after_id = int(args["after_id"]) if "after_id" in args else None
+                if after_created_at:
+                    datetime.fromisoformat(after_created_at)
+            except ValueError:
+                return jsonify({"error": "Invalid pagination parameters"}), 400
 
             # Cap limits for safety
-            limit = min(limit, 100)
+            limit = min(max(limit, 1), 100)
             offset = max(offset, 0)
+            use_cursor = bool(after_created_at) and after_id is not None
 
-            conn = current_app.config.get("db_connection")
+            if not use_cursor and offset > _MAX_OFFSET:
+                return jsonify({"error": "Offset too large - use after_created_at/after_id cursor pagination"}), 400
+
+            conn = get_db_connection()
             if not conn:
                 return jsonify({"error": "Database not available"}), 503
 
             try:
                 cursor = conn.cursor()
 
-                # Get generations with R2 URLs
-                cursor.execute(
-                    """
-                    SELECT id, category, person_image_url, garment_image_url,
-                           result_image_url, result_r2_url, thumbnail_url,
-                           title, is_favorite, status, created_at, updated_at
-                    FROM generations
-                    WHERE user_id = %s AND status = 'completed'
-                    ORDER BY created_at DESC
-                    LIMIT %s OFFSET %s
-                    """,
-                    (user_id, limit, offset),
-                )
+                # Get generations with R2 URLs (one extra row tells whether there's a next page)
+                if use_cursor:
+                    name, sql = _TRYONS_STATEMENTS["after", favorites_only]
+                    execute_prepared(cursor, name, sql, (user_id, after_created_at, after_id, limit + 1))
+                else:
+                    name, sql = _TRYONS_STATEMENTS["offset", favorites_only]
+                    execute_prepared(cursor, name, sql, (user_id, limit + 1, offset))
 
+                # Datetimes are serialized natively by the orjson provider
                 rows = cursor.fetchall()
+                has_more = len(rows) > limit
+                tryons = [dict(zip(_TRYON_COLUMNS, row)) for row in rows[:limit]]
 
-                # Get total count
-                cursor.execute(
-                    """
-                    SELECT COUNT(*)
-                    FROM generations
-                    WHERE user_id = %s AND status = 'completed'
-                    """,
-                    (user_id,),
-                )
-                total = cursor.fetchone()[0]
+                if not use_cursor and not has_more and (tryons or not offset):
+                    # Last page in offset mode: the total is known without counting
+                    total = offset + len(tryons)
+                else:
+                    try:
+                        name, sql = _TRYONS_STATEMENTS["total", favorites_only]
+                        execute_prepared(cursor, name, sql, (user_id,))
+                    except UndefinedTable:
+                        # Summary table not created yet - count the rows instead
+                        conn.rollback()
+                        name, sql = _TRYONS_STATEMENTS["count", favorites_only]
+                        execute_prepared(cursor, name, sql, (user_id,))
+                    total = cursor.fetchone()[0]
 
                 cursor.close()
-                # Don't close conn - it's shared app connection
-
-                tryons = []
-                for row in rows:
-                    tryon = {
-                        "id": row[0],
-                        "category": row[1],
-                        "person_image": row[2],
-                        "garment_image": row[3],
-                        "result_url": row[5] if row[5] else row[4],  # Prefer R2 URL
-                        "thumbnail_url": row[6],
-                        "title": row[7],
-                        "is_favorite": row[8] or False,
-                        "status": row[9],
-                        "created_at": row[10].isoformat() if row[10] else None,
-                        "updated_at": row[11].isoformat() if row[11] else None,
-                    }
-                    tryons.append(tryon)
+
+                next_cursor = None
+                if has_more and tryons:
+                    last = tryons[-1]
+                    next_cursor = {"after_created_at": last["created_at"].isoformat(), "after_id": last["id"]}
 
                 return jsonify({
                     "success": True,
@@ -114,13 +250,17 @@ def create_user_tryons_blueprint(auth_manager: AuthManager) -> Blueprint:
                     "total": total,
                     "limit": limit,
                     "offset": offset,
-                    "has_more": (offset + len(tryons)) < total,
+                    "has_more": has_more,
+                    "next_cursor": next_cursor,
                 })
 
             except Exception as e:
                 logger.error(f"Error fetching user tryons: {e}", exc_info=True)
                 return jsonify({"error": "Failed to fetch tryons"}), 500
 
+            finally:
+                put_db_connection(conn)
+
         except Exception as e:
             logger.error(f"Error in get_user_tryons: {e}", exc_info=True)
             return jsonify({"error": str(e)}), 500
@@ -137,7 +277,7 @@ def create_user_tryons_blueprint(auth_manager: AuthManager) -> Blueprint:
             data = request.get_json() or {}
             is_favorite = data.get("is_favorite", True)
 
-            conn = current_app.config.get("db_connection")
+            conn = get_db_connection()
             if not conn:
                 return jsonify({"error": "Database not available"}), 503
 
@@ -146,6 +286,7 @@ def create_user_tryons_blueprint(auth_manager: AuthManager) -> Blueprint:
                 success = repo.set_favorite(tryon_id, user_id, is_favorite)
 
                 if success:
+                    user_stats_cache.delete(user_id)
                     return jsonify({
                         "success": True,
                         "is_favorite": is_favorite,
@@ -157,6 +298,9 @@ def create_user_tryons_blueprint(auth_manager: AuthManager) -> Blueprint:
                 logger.error(f"Error toggling favorite: {e}", exc_info=True)
                 return jsonify({"error": "Failed to update favorite"}), 500
 
+            finally:
+                put_db_connection(conn)
+
         except Exception as e:
             logger.error(f"Error in toggle_favorite: {e}", exc_info=True)
             return jsonify({"error": str(e)}), 500
@@ -179,7 +323,7 @@ def create_user_tryons_blueprint(auth_manager: AuthManager) -> Blueprint:
             if len(title) > 255:
                 return jsonify({"error": "Title too long (max 255 characters)"}), 400
 
-            conn = current_app.config.get("db_connection")
+            conn = get_db_connection()
             if not conn:
                 return jsonify({"error": "Database not available"}), 503
 
@@ -199,89 +343,150 @@ def create_user_tryons_blueprint(auth_manager: AuthManager) -> Blueprint:
                 logger.error(f"Error updating title: {e}", exc_info=True)
                 return jsonify({"error": "Failed to update title"}), 500
 
+            finally:
+                put_db_connection(conn)
+
         except Exception as e:
             logger.error(f"Error in update_title: {e}", exc_info=True)
             return jsonify({"error": str(e)}), 500
 
+    @user_tryons_bp.route("/api/user/tryons/bulk", methods=["PATCH"])
+    @require_auth
+    def bulk_update_tryons(user):
+        """
+        Update favorite flag and/or title of several try-ons in one request.
+
+        Request JSON:
+        [
+            {"id": 12, "is_favorite": true},
+            {"id": 15, "title": "Summer look"},
+            {"id": 17, "is_favorite": false, "title": "Office"}
+        ]
+
+        Response:
+        {
+            "success": true,
+            "updated_ids": [12, 15, 17]  // only try-ons owned by the user
+        }
+        """
+        try:
+            user_id = user.get("id")
+            if not user_id:
+                return jsonify({"error": "Invalid user"}), 401
+
+            items = request.get_json(silent=True)
+            if not isinstance(items, list) or not items:
+                return jsonify({"error": "Expected a non-empty list of updates"}), 400
+
+            if len(items) > _MAX_BULK_ITEMS:
+                return jsonify({"error": f"Too many updates (max {_MAX_BULK_ITEMS})"}), 400
+
+            updates = []
+            for item in items:
+                item_id = item.get("id") if isinstance(item, dict) else None
+                if not isinstance(item_id, int) or isinstance(item_id, bool):
+                    return jsonify({"error": "Each update needs an integer id"}), 400
+
+                is_favorite = item.get("is_favorite")
+                if is_favorite is not None and not isinstance(is_favorite, bool):
+                    return jsonify({"error": "is_favorite must be a boolean"}), 400
+
+                title = item.get("title")
+                if title is not None:
+                    if not isinstance(title, str) or not title.strip():
+                        return jsonify({"error": "Title is required"}), 400
+                    title = title.strip()
+                    if len(title) > 255:
+                        return jsonify({"error": "Title too long (max 255 characters)"}), 400
+
+                if is_favorite is None and title is None:
+                    return jsonify({"error": "Nothing to update"}), 400
+
+                updates.append({"id": item_id, "is_favorite": is_favorite, "title": title})
+
+            conn = get_db_connection()
+            if not conn:
+                return jsonify({"error": "Database not available"}), 503
+
+            try:
+                repo = GenerationRepository(conn)
+                updated_ids = repo.bulk_update(user_id, updates)
+
+                if any(u["is_favorite"] is not None for u in updates):
+                    user_stats_cache.delete(user_id)
+
+                return jsonify({
+                    "success": True,
+                    "updated_ids": updated_ids,
+                })
+
+            except Exception as e:
+                logger.error(f"Error bulk updating tryons: {e}", exc_info=True)
+                return jsonify({"error": "Failed to update tryons"}), 500
+
+            finally:
+                put_db_connection(conn)
+
+        except Exception as e:
+            logger.error(f"Error in bulk_update_tryons: {e}", exc_info=True)
+            return jsonify({"error": str(e)}), 500
+
     @user_tryons_bp.route("/api/user/tryons/stats", methods=["GET"])
     @require_auth
     def get_user_stats(user):
-        """Get user's try-on statistics."""
+        """Get user's try-on statistics (cached per user for 60s, invalidated on writes)."""
         try:
             user_id = user.get("id")
             if not user_id:
                 return jsonify({"error": "Invalid user"}), 401
 
-            conn = current_app.config.get("db_connection")
+            stats = user_stats_cache.get(user_id)
+            if stats is not None:
+                return jsonify({"success": True, "stats": stats})
+
+            conn = get_db_connection()
             if not conn:
                 return jsonify({"error": "Database not available"}), 503
 
             try:
                 cursor = conn.cursor()
 
-                # Total completed generations
-                cursor.execute(
-                    """
-                    SELECT COUNT(*)
-                    FROM generations
-                    WHERE user_id = %s AND status = 'completed'
-                    """,
-                    (user_id,),
-                )
-                total = cursor.fetchone()[0]
-
-                # Favorites count
-                cursor.execute(
-                    """
-                    SELECT COUNT(*)
-                    FROM generations
-                    WHERE user_id = %s AND status = 'completed' AND is_favorite = TRUE
-                    """,
-                    (user_id,),
-                )
-                favorites = cursor.fetchone()[0]
-
-                # By category
-                cursor.execute(
-                    """
-                    SELECT category, COUNT(*)
-                    FROM generations
-                    WHERE user_id = %s AND status = 'completed'
-                    GROUP BY category
-                    """,
-                    (user_id,),
-                )
-                by_category = {row[0]: row[1] for row in cursor.fetchall()}
-
-                # Total R2 storage used
-                cursor.execute(
-                    """
-                    SELECT COALESCE(SUM(r2_upload_size), 0)
-                    FROM generations
-                    WHERE user_id = %s AND r2_upload_size IS NOT NULL
-                    """,
-                    (user_id,),
-                )
-                storage_bytes = cursor.fetchone()[0]
+                try:
+                    execute_prepared(cursor, "tryons_category_stats", _SQL_TRYONS_STATS, (user_id,))
+                except UndefinedTable:
+                    # Summary table not created yet - aggregate the user's generations
+                    conn.rollback()
+                    execute_prepared(cursor, "tryons_category_stats_agg", _SQL_TRYONS_STATS_AGGREGATE, (user_id,))
+
+                total = favorites = storage_bytes = 0
+                by_category = {}
+                for category, completed, favorite_count, size_bytes in cursor.fetchall():
+                    total += completed
+                    favorites += favorite_count
+                    storage_bytes += size_bytes
+                    if completed:
+                        by_category[category or None] = completed
 
                 cursor.close()
-                # Don't close conn - it's shared app connection
 
-                return jsonify({
-                    "success": True,
-                    "stats": {
-                        "total": total,
-                        "favorites": favorites,
-                        "by_category": by_category,
-                        "storage_used_bytes": storage_bytes,
-                        "storage_used_mb": round(storage_bytes / (1024 * 1024), 2),
-                    },
-                })
+                stats = {
+                    "total": total,
+                    "favorites": favorites,
+                    "by_category": by_category,
+                    "storage_used_bytes": storage_bytes,
+                    "storage_used_mb": round(storage_bytes / (1024 * 1024), 2),
+                }
+                user_stats_cache.set(user_id, stats)
+
+                return jsonify({"success": True, "stats": stats})
 
             except Exception as e:
                 logger.error(f"Error fetching user stats: {e}", exc_info=True)
                 return jsonify({"error": "Failed to fetch stats"}), 500
 
+            finally:
+                put_db_connection(conn)
+
         except Exception as e:
             logger.error(f"Error in get_user_stats: {e}", exc_info=True)
             return jsonify({"error": str(e)}), 500
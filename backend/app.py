@@ -2,6 +2,12 @@
 Main Flask application entry point.
 
 Uses application factory pattern for clean dependency injection.
+
+Production serves `app` with gunicorn (gthread workers, see gunicorn.conf.py):
+    gunicorn backend.app:app -c gunicorn.conf.py
+Running this module directly applies pending migrations (see backend.migrate)
+and starts Werkzeug's development server, which is meant for local development
+only (it also works on Windows, unlike gunicorn).
 """
 
 from backend.app_factory import create_app_from_env
@@ -22,5 +28,11 @@ if __name__ == "__main__":
     print(f"Debug: {debug}")
     print("=" * 60)
 
-    # Run application
-    app.run(host="0.0.0.0", port=port, debug=debug)
+    # gunicorn runs these from its on_starting hook; the dev server has no master process
+    from backend.config import get_settings
+    from backend.migrate import run_migrations
+
+    run_migrations(get_settings().database_url_str)
+
+    # Development server only; threaded so a slow try-on doesn't block other requests
+    app.run(host="0.0.0.0", port=port, debug=debug, threaded=True)
@@ -9,7 +9,6 @@ import hashlib
 import os
 from typing import Optional
 
-import psycopg2
 from flask import Flask
 from flask_cors import CORS
 from flask_limiter import Limiter
@@ -23,6 +22,7 @@ from backend.api.google_auth import create_google_auth_blueprint
 from backend.api.static import create_static_blueprint
 from backend.api.tryon import create_tryon_blueprint
 from backend.api.upload import create_upload_blueprint
+from backend.api.user_tryons import create_user_tryons_blueprint
 from backend.auth import AuthManager
 from backend.clients.nanobanana_client import NanoBananaClient
 from backend.clients.telegram_client import TelegramClient
@@ -41,101 +41,13 @@ from backend.services.image_service import ImageService
 from backend.services.limit_service import LimitService
 from backend.services.notification_service import NotificationService
 from backend.services.tryon_service import TryonService
+from backend.utils.db_helpers import ScopedConnection, init_db_pool
 from backend.utils.file_helpers import start_cleanup_scheduler
+from backend.utils.json_provider import OrjsonProvider
 
 logger = get_logger(__name__)
 
 
-def _apply_pending_migrations(db_conn, logger):
-    """
-    Apply pending database migrations automatically.
-
-    Checks for missing columns and adds them if necessary.
-    This ensures the database schema is always up-to-date.
-    """
-    try:
-        cursor = db_conn.cursor()
-
-        # Check if generations table has device_fingerprint column
-        cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.columns
-                WHERE table_name = 'generations' AND column_name = 'device_fingerprint'
-            )
-        """)
-        has_device_fingerprint = cursor.fetchone()[0]
-
-        if not has_device_fingerprint:
-            logger.info("[MIGRATION] Adding device_fingerprint column to generations table...")
-            cursor.execute("""
-                ALTER TABLE generations ADD COLUMN IF NOT EXISTS device_fingerprint VARCHAR(255);
-                ALTER TABLE generations ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT NOW();
-                CREATE INDEX IF NOT EXISTS idx_generations_device_fingerprint ON generations(device_fingerprint);
-            """)
-            db_conn.commit()
-            logger.info("[MIGRATION] Successfully added device_fingerprint and updated_at columns")
-
-        # Check if admin_audit_logs table exists
-        cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables
-                WHERE table_name = 'admin_audit_logs'
-            )
-        """)
-        has_audit_logs = cursor.fetchone()[0]
-
-        if not has_audit_logs:
-            logger.info("[MIGRATION] Creating admin_audit_logs table...")
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS admin_audit_logs (
-                    id SERIAL PRIMARY KEY,
-                    admin_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-                    action VARCHAR(100) NOT NULL,
-                    target_type VARCHAR(50) NOT NULL,
-                    target_id INTEGER,
-                    payload JSONB,
-                    ip_address VARCHAR(45),
-                    user_agent TEXT,
-                    created_at TIMESTAMP NOT NULL DEFAULT NOW()
-                );
-                CREATE INDEX IF NOT EXISTS idx_admin_audit_logs_admin_id ON admin_audit_logs(admin_id);
-                CREATE INDEX IF NOT EXISTS idx_admin_audit_logs_created_at ON admin_audit_logs(created_at DESC);
-            """)
-            db_conn.commit()
-            logger.info("[MIGRATION] Successfully created admin_audit_logs table")
-
-        # Check if generations table has R2 storage columns (Migration 007)
-        cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.columns
-                WHERE table_name = 'generations' AND column_name = 'result_r2_key'
-            )
-        """)
-        has_r2_columns = cursor.fetchone()[0]
-
-        if not has_r2_columns:
-            logger.info("[MIGRATION] Adding R2 storage columns to generations table...")
-            cursor.execute("""
-                ALTER TABLE generations ADD COLUMN IF NOT EXISTS result_r2_key TEXT;
-                ALTER TABLE generations ADD COLUMN IF NOT EXISTS result_r2_url TEXT;
-                ALTER TABLE generations ADD COLUMN IF NOT EXISTS thumbnail_url TEXT;
-                ALTER TABLE generations ADD COLUMN IF NOT EXISTS title VARCHAR(255);
-                ALTER TABLE generations ADD COLUMN IF NOT EXISTS is_favorite BOOLEAN DEFAULT FALSE;
-                ALTER TABLE generations ADD COLUMN IF NOT EXISTS r2_upload_size INTEGER;
-            """)
-            db_conn.commit()
-            logger.info("[MIGRATION] Successfully added R2 storage columns (result_r2_key, result_r2_url, thumbnail_url, title, is_favorite, r2_upload_size)")
-
-        cursor.close()
-    except Exception as e:
-        logger.warning(f"[MIGRATION] Auto-migration failed (non-critical): {e}")
-        # Don't fail app startup if migration fails
-        try:
-            db_conn.rollback()
-        except Exception:
-            pass
-
-
 def create_app(config: Optional[Settings] = None) -> Flask:
     """
     Application factory function.
@@ -164,9 +76,12 @@ def create_app(config: Optional[Settings] = None) -> Flask:
     frontend_folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend")
     app = Flask(__name__, static_folder=frontend_folder, static_url_path="")
 
+    # orjson for every jsonify()/get_json() call
+    app.json = OrjsonProvider(app)
+
     # Store config in app
     app.config["SETTINGS"] = config
-    app.config["SECRET_KEY"] = config.jwt_secret_key  # For Flask session management (Google OAuth)
+    app.config["SECRET_KEY"] = config.jwt_secret_key  # For Flask session signing
     app.config["db_connection"] = None  # Will be set later after DB connection is established
 
     # Configure CORS
@@ -219,12 +134,19 @@ def create_app(config: Optional[Settings] = None) -> Flask:
     db_conn = None
     if config.database_url:
         try:
-            db_conn = psycopg2.connect(str(config.database_url))
+            # Schema migrations are not applied here: they run once per deploy
+            # (backend.migrate, from the gunicorn master's on_starting hook).
+
+            # Repositories and services share one ScopedConnection: each request thread
+            # (and background task) gets its own pooled connection behind it
+            init_db_pool(str(config.database_url), config.db_pool_min_connections, config.db_pool_max_connections)
+            logger.info("[OK] Database connection pool established")
+            db_conn = ScopedConnection()
             app.config["db_connection"] = db_conn  # Store for require_admin decorator
-            logger.info("[OK] Database connection established")
 
-            # Auto-apply pending migrations
-            _apply_pending_migrations(db_conn, logger)
+            @app.teardown_appcontext
+            def _release_db_connection(exc):
+                db_conn.release()
         except Exception as e:
             logger.error(f"[ERROR] Database connection failed: {e}")
             db_conn = None
@@ -388,7 +310,6 @@ def create_app(config: Optional[Settings] = None) -> Flask:
 
     # User tryons history blueprint
     if auth_manager:
-        from backend.api.user_tryons import create_user_tryons_blueprint
         user_tryons_bp = create_user_tryons_blueprint(auth_manager)
         app.register_blueprint(user_tryons_bp)
         logger.info("  - User tryons blueprint registered")
@@ -396,7 +317,9 @@ def create_app(config: Optional[Settings] = None) -> Flask:
         logger.warning("  - User tryons blueprint skipped (auth not available)")
 
     # Static files blueprint (must be last for SPA fallback)
-    static_bp = create_static_blueprint(upload_folder, results_folder, frontend_folder)
+    static_bp = create_static_blueprint(
+        upload_folder, results_folder, frontend_folder, x_accel_redirect=config.x_accel_redirect
+    )
     app.register_blueprint(static_bp)
     logger.info("  - Static blueprint registered")
 
@@ -1,15 +1,67 @@
 """NanoBanana AI API client for virtual try-on."""
 
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
 
 import requests
 from PIL import Image
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from backend.logger import get_logger
+from backend.utils.cache_helpers import TTLCache
 
 logger = get_logger(__name__)
 
+# Keep-alive pool per host: matches the try-on thread pool (one polling connection per task)
+_POOL_SIZE = 32
+
+# Transient gateway errors are retried for idempotent calls only (Retry's default
+# allowed_methods excludes POST, so a task is never submitted twice)
+_RETRY = Retry(total=3, backoff_factor=0.2, status_forcelist=(429, 502, 503, 504))
+
+# Image URL checks (HEAD) run concurrently: the caller checks one URL itself and
+# hands the other to this pool, sized like the try-on pool so a check never queues
+# behind other requests'. A URL that answered 200 is not re-checked for a while
+# (the garment URL is shared by every image of a request).
+_VERIFY_POOL = ThreadPoolExecutor(max_workers=_POOL_SIZE, thread_name_prefix="NanoBananaVerify")
+_VERIFIED_URL_TTL_SECONDS = 600
+
+# Read size for streaming result downloads to disk
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Status polling backoff: 0.5s, 0.75s, 1.1s, ... capped at 3s (+/-10% jitter)
+_POLL_INITIAL_DELAY = 0.5
+_POLL_BACKOFF = 1.5
+_POLL_MAX_DELAY = 3.0
+
+
+def _build_prompt(garment_type: str) -> str:
+    """Try-on prompt for a garment type (built once per category at import)."""
+    return (
+        f"Replace the clothing on the person in the first image with the {garment_type} "
+        f"shown in the second image. The {garment_type} must be placed accurately on the "
+        f"person's body, matching their pose and body shape. Preserve the exact colors, "
+        f"patterns, textures, and style of the {garment_type} from the second image. "
+        f"Ensure the {garment_type} fits naturally with realistic shadows, lighting, and "
+        f"fabric draping. The result should show the person wearing the {garment_type}, "
+        f"not just the original image."
+    )
+
+
+# Prompt per garment category; unknown categories use "auto"
+_PROMPTS = {
+    category: _build_prompt(garment_type)
+    for category, garment_type in (
+        ("auto", "garment"),
+        ("tops", "top"),
+        ("bottoms", "bottom"),
+        ("one-pieces", "full outfit"),
+    )
+}
+
 
 class NanoBananaClient:
     """
@@ -34,6 +86,22 @@ class NanoBananaClient:
         self.timeout = timeout
         self.logger = get_logger(__name__)
 
+        # Shared by all calls (and threads) so status polls reuse TLS connections.
+        # The API key is sent per request, not set on the session: URL checks and
+        # result downloads go to other hosts.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=_POOL_SIZE, pool_maxsize=_POOL_SIZE, max_retries=_RETRY)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # URL checks are diagnostic only: one attempt each, no _RETRY backoff
+        self.verify_session = requests.Session()
+        verify_adapter = HTTPAdapter(pool_connections=_POOL_SIZE, pool_maxsize=_POOL_SIZE, max_retries=0)
+        self.verify_session.mount("https://", verify_adapter)
+        self.verify_session.mount("http://", verify_adapter)
+
+        self._verified_urls = TTLCache(ttl_seconds=_VERIFIED_URL_TTL_SECONDS)
+
     def generate_tryon(
         self,
         person_image_url: str,
@@ -108,34 +176,47 @@ class NanoBananaClient:
 
     def _verify_urls(self, person_url: str, garment_url: str):
         """
-        Verify image URLs are accessible.
+        Verify image URLs are accessible (diagnostic only, never raises).
 
-        Raises:
-            ValueError: If URLs are not accessible
+        URLs verified within the last _VERIFIED_URL_TTL_SECONDS are skipped.
+        The first remaining URL is checked on the calling thread while the
+        other (if any) is checked on _VERIFY_POOL.
         """
+        pending = [
+            (label, url)
+            for label, url in (("Person", person_url), ("Garment", garment_url))
+            if self._verified_urls.get(url) is None
+        ]
+        if not pending:
+            return
+
         self.logger.info("Verifying image URLs are accessible...")
 
-        try:
-            person_check = requests.head(person_url, timeout=5, allow_redirects=True)
-            garment_check = requests.head(garment_url, timeout=5, allow_redirects=True)
+        futures = [_VERIFY_POOL.submit(self._check_url, label, url) for label, url in pending[1:]]
+        self._check_url(*pending[0])
+        for future in futures:
+            future.result()
 
-            if person_check.status_code != 200:
-                self.logger.warning(
-                    f"Person image URL returned {person_check.status_code}: {person_url}"
-                )
-            else:
-                self.logger.info("Person image URL is accessible")
-
-            if garment_check.status_code != 200:
-                self.logger.warning(
-                    f"Garment image URL returned {garment_check.status_code}: {garment_url}"
-                )
-            else:
-                self.logger.info("Garment image URL is accessible")
+    def _check_url(self, label: str, url: str):
+        """
+        HEAD one image URL and log the outcome; remember it if accessible.
 
+        Args:
+            label: "Person" or "Garment" (for log messages)
+            url: Public image URL
+        """
+        try:
+            response = self.verify_session.head(url, timeout=5, allow_redirects=True)
         except Exception as e:
-            self.logger.warning(f"Could not verify URL accessibility: {e}")
+            self.logger.warning(f"Could not verify {label.lower()} image URL accessibility: {e}")
             self.logger.warning("Continuing anyway - API will handle errors...")
+            return
+
+        if response.status_code != 200:
+            self.logger.warning(f"{label} image URL returned {response.status_code}: {url}")
+        else:
+            self._verified_urls.set(url, True)
+            self.logger.info(f"{label} image URL is accessible")
 
     def _submit_task(self, person_url: str, garment_url: str, category: str) -> str:
         """
@@ -147,24 +228,7 @@ class NanoBananaClient:
         Raises:
             ValueError: If API returns error
         """
-        # Create optimized prompt for virtual try-on
-        category_map = {
-            "auto": "garment",
-            "tops": "top",
-            "bottoms": "bottom",
-            "one-pieces": "full outfit",
-        }
-        garment_type = category_map.get(category, "garment")
-
-        prompt = (
-            f"Replace the clothing on the person in the first image with the {garment_type} "
-            f"shown in the second image. The {garment_type} must be placed accurately on the "
-            f"person's body, matching their pose and body shape. Preserve the exact colors, "
-            f"patterns, textures, and style of the {garment_type} from the second image. "
-            f"Ensure the {garment_type} fits naturally with realistic shadows, lighting, and "
-            f"fabric draping. The result should show the person wearing the {garment_type}, "
-            f"not just the original image."
-        )
+        prompt = _PROMPTS.get(category, _PROMPTS["auto"])
 
         self.logger.info(f"Prompt: {prompt[:100]}...")
 
@@ -185,7 +249,7 @@ class NanoBananaClient:
         self.logger.info(f"POST to: {generate_url}")
 
         try:
-            response = requests.post(generate_url, headers=headers, json=payload, timeout=30)
+            response = self.session.post(generate_url, headers=headers, json=payload, timeout=30)
             self.logger.info(f"API Response Status: {response.status_code}")
 
             if response.status_code != 200:
@@ -213,6 +277,9 @@ class NanoBananaClient:
         """
         Poll task status until completion.
 
+        Polls quickly at first (most tasks finish within seconds) and backs
+        off exponentially, giving up after self.timeout seconds.
+
         Args:
             task_id: Task ID to poll
 
@@ -222,20 +289,26 @@ class NanoBananaClient:
         Raises:
             ValueError: If task fails or times out
         """
-        max_attempts = 60  # 120 seconds total (60 * 2s)
-        poll_interval = 2
+        deadline = time.monotonic() + self.timeout
+        delay = _POLL_INITIAL_DELAY
+        attempt = 0
 
         headers = {"Authorization": f"Bearer {self.api_key}"}
 
-        for attempt in range(max_attempts):
+        while True:
             if attempt > 0:
-                time.sleep(poll_interval)
+                sleep_for = delay * random.uniform(0.9, 1.1)
+                if time.monotonic() + sleep_for > deadline:
+                    break
+                time.sleep(sleep_for)
+                delay = min(delay * _POLL_BACKOFF, _POLL_MAX_DELAY)
+            attempt += 1
 
             status_url = f"{self.BASE_URL}/record-info?taskId={task_id}"
-            self.logger.info(f"Status check {attempt + 1}/{max_attempts}")
+            self.logger.info(f"Status check {attempt} (next in {delay:.2f}s)")
 
             try:
-                status_response = requests.get(status_url, headers=headers, timeout=10)
+                status_response = self.session.get(status_url, headers=headers, timeout=10)
             except requests.RequestException as e:
                 self.logger.warning(f"Request failed: {e}")
                 continue  # Continue polling on network errors
@@ -286,10 +359,7 @@ class NanoBananaClient:
             self.logger.info(f"Task still processing (successFlag={success_flag})")
 
         # Timeout
-        raise ValueError(
-            f"Task timed out after {max_attempts * poll_interval} seconds "
-            f"({max_attempts} attempts)"
-        )
+        raise ValueError(f"Task timed out after {self.timeout} seconds ({attempt} attempts)")
 
     def _parse_success_flag(self, data_obj: Dict) -> int:
         """Parse success flag from API response (can be int or string)."""
@@ -348,16 +418,17 @@ class NanoBananaClient:
         self.logger.info(f"Downloading result from: {result_url}")
 
         try:
-            img_response = requests.get(result_url, timeout=30)
-
-            if img_response.status_code != 200:
-                raise ValueError(f"Failed to download result: HTTP {img_response.status_code}")
+            # Streamed straight to disk in chunks instead of buffering the whole image
+            with self.session.get(result_url, timeout=30, stream=True) as img_response:
+                if img_response.status_code != 200:
+                    raise ValueError(f"Failed to download result: HTTP {img_response.status_code}")
 
-            # Save image
-            with open(output_path, "wb") as img_file:
-                img_file.write(img_response.content)
+                file_size = 0
+                with open(output_path, "wb") as img_file:
+                    for chunk in img_response.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                        img_file.write(chunk)
+                        file_size += len(chunk)
 
-            file_size = len(img_response.content)
             self.logger.info(f"Downloaded: {output_path} ({file_size} bytes)")
 
             # Verify image
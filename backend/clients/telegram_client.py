@@ -5,11 +5,21 @@ import time
 from typing import Callable, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from backend.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Keep-alive pool for api.telegram.org (notifications are sent from request threads).
+# No adapter-level retries: _retry_with_backoff already retries failed sends.
+_POOL_SIZE = 8
+
+# (connect, read) timeouts: fail fast on DNS/TLS trouble so _retry_with_backoff gets
+# another attempt instead of one slow handshake eating the whole budget
+_TIMEOUT = (2, 8)
+_PHOTO_TIMEOUT = (2, 28)
+
 
 class TelegramClient:
     """
@@ -37,6 +47,13 @@ class TelegramClient:
         self.default_chat_id = default_chat_id
         self.logger = get_logger(__name__)
 
+        # Method URLs embed the token; build the prefix once
+        self._api_url = f"{self.BASE_URL}/bot{bot_token}"
+
+        # Shared by all calls so each notification reuses the TLS connection
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=_POOL_SIZE))
+
     def send_message(
         self,
         text: str,
@@ -72,11 +89,11 @@ class TelegramClient:
         except (ValueError, TypeError):
             chat_id_int = chat_id
 
-        url = f"{self.BASE_URL}/bot{self.bot_token}/sendMessage"
+        url = f"{self._api_url}/sendMessage"
         data = {"chat_id": chat_id_int, "text": text, "parse_mode": parse_mode}
 
         def send_request():
-            response = requests.post(url, json=data, timeout=10)
+            response = self.session.post(url, json=data, timeout=_TIMEOUT)
             return self._handle_response(response, "message")
 
         return self._retry_with_backoff(send_request, max_retries, operation="send_message")
@@ -121,7 +138,7 @@ class TelegramClient:
         except (ValueError, TypeError):
             chat_id_int = chat_id
 
-        url = f"{self.BASE_URL}/bot{self.bot_token}/sendPhoto"
+        url = f"{self._api_url}/sendPhoto"
 
         def send_request():
             with open(photo_path, "rb") as photo_file:
@@ -132,7 +149,7 @@ class TelegramClient:
                     data["caption"] = caption
                     data["parse_mode"] = parse_mode
 
-                response = requests.post(url, files=files, data=data, timeout=30)
+                response = self.session.post(url, files=files, data=data, timeout=_PHOTO_TIMEOUT)
 
             return self._handle_response(response, "photo")
 
@@ -150,10 +167,10 @@ class TelegramClient:
             >>> if bot_info:
             ...     print(f"Bot username: @{bot_info['username']}")
         """
-        url = f"{self.BASE_URL}/bot{self.bot_token}/getMe"
+        url = f"{self._api_url}/getMe"
 
         try:
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=_TIMEOUT)
             if response.status_code == 200:
                 data = response.json()
                 if data.get("ok"):
@@ -181,10 +198,10 @@ class TelegramClient:
             >>> for update in updates:
             ...     print(f"Message from: {update['message']['from']['id']}")
         """
-        url = f"{self.BASE_URL}/bot{self.bot_token}/getUpdates?limit={limit}"
+        url = f"{self._api_url}/getUpdates?limit={limit}"
 
         try:
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=_TIMEOUT)
             if response.status_code == 200:
                 data = response.json()
                 if data.get("ok"):
@@ -257,7 +274,7 @@ class TelegramClient:
             data = response.json()
             if data.get("ok"):
                 message_id = data.get("result", {}).get("message_id", "N/A")
-                self.logger.info(f"Telegram {operation_type} sent successfully (msg_id: {message_id})")
+                self.logger.debug("Telegram %s sent successfully (msg_id: %s)", operation_type, message_id)
                 return True, None
             else:
                 error_desc = data.get("description", "Unknown API error")
@@ -293,13 +310,13 @@ class TelegramClient:
 
         for attempt in range(1, max_retries + 1):
             try:
-                self.logger.info(f"[{operation}] Attempt {attempt}/{max_retries}")
+                self.logger.debug("[%s] Attempt %d/%d", operation, attempt, max_retries)
 
                 # Execute the function
                 success, error = func()
 
                 if success:
-                    self.logger.info(f"[{operation}] SUCCESS on attempt {attempt}")
+                    self.logger.debug("[%s] SUCCESS on attempt %d", operation, attempt)
                     return True, None
                 else:
                     last_error = error
@@ -0,0 +1,270 @@
+"""
+One-off database migrations.
+
+Runs the schema checks that keep the database up-to-date (missing columns,
+tables, indexes). They run once per deploy, from the gunicorn master before
+workers are forked (see on_starting in gunicorn.conf.py), and can be run by hand:
+
+    python -m backend.migrate
+
+A session-level advisory lock serializes concurrent runs (several instances
+starting at once), so each migration is applied by exactly one process.
+"""
+
+import os
+import sys
+
+import psycopg2
+
+from backend.logger import get_logger
+
+logger = get_logger(__name__)
+
+# pg_advisory_lock key reserved for schema migrations
+_MIGRATION_LOCK_ID = 0x7472796F6E  # "tryon"
+
+
+def _run_outside_transaction(db_conn, sql: str) -> None:
+    """Execute a statement in autocommit mode (required by CREATE/DROP INDEX CONCURRENTLY)."""
+    db_conn.commit()
+    autocommit = db_conn.autocommit
+    db_conn.autocommit = True
+    try:
+        with db_conn.cursor() as cursor:
+            cursor.execute(sql)
+    finally:
+        db_conn.autocommit = autocommit
+
+
+def _build_index_concurrently(db_conn, index_name: str, create_sql: str) -> bool:
+    """
+    Create an index with CREATE INDEX CONCURRENTLY unless a valid one exists.
+
+    A concurrent build that fails or is interrupted leaves an INVALID index
+    behind, which IF NOT EXISTS would then skip forever; such an index is
+    dropped and built again.
+
+    Args:
+        db_conn: Migration connection
+        index_name: Index name (constant identifier, not user input)
+        create_sql: CREATE INDEX CONCURRENTLY statement (without IF NOT EXISTS)
+
+    Returns:
+        True if the index was built by this call
+    """
+    with db_conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT i.indisvalid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = %s
+            """,
+            (index_name,),
+        )
+        row = cursor.fetchone()
+
+    if row and row[0]:
+        return False
+
+    if row:
+        logger.warning(f"[MIGRATION] Index {index_name} is INVALID (interrupted build) - rebuilding")
+        _run_outside_transaction(db_conn, f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+
+    logger.info(f"[MIGRATION] Creating index {index_name}...")
+    _run_outside_transaction(db_conn, create_sql)
+    logger.info(f"[MIGRATION] Successfully created {index_name}")
+    return True
+
+
+def apply_pending_migrations(db_conn) -> None:
+    """
+    Apply pending database migrations.
+
+    Checks for missing columns, tables and indexes and adds them if necessary.
+    Callers must hold the migration lock (see run_migrations).
+
+    Args:
+        db_conn: psycopg2 connection dedicated to migrations
+    """
+    try:
+        cursor = db_conn.cursor()
+
+        # Check if generations table has device_fingerprint column
+        cursor.execute("""
+            SELECT EXISTS (
+                SELECT FROM information_schema.columns
+                WHERE table_name = 'generations' AND column_name = 'device_fingerprint'
+            )
+        """)
+        has_device_fingerprint = cursor.fetchone()[0]
+
+        if not has_device_fingerprint:
+            logger.info("[MIGRATION] Adding device_fingerprint column to generations table...")
+            cursor.execute("""
+                ALTER TABLE generations ADD COLUMN IF NOT EXISTS device_fingerprint VARCHAR(255);
+                ALTER TABLE generations ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT NOW();
+                CREATE INDEX IF NOT EXISTS idx_generations_device_fingerprint ON generations(device_fingerprint);
+            """)
+            db_conn.commit()
+            logger.info("[MIGRATION] Successfully added device_fingerprint and updated_at columns")
+
+        # Check if admin_audit_logs table exists
+        cursor.execute("""
+            SELECT EXISTS (
+                SELECT FROM information_schema.tables
+                WHERE table_name = 'admin_audit_logs'
+            )
+        """)
+        has_audit_logs = cursor.fetchone()[0]
+
+        if not has_audit_logs:
+            logger.info("[MIGRATION] Creating admin_audit_logs table...")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS admin_audit_logs (
+                    id SERIAL PRIMARY KEY,
+                    admin_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                    action VARCHAR(100) NOT NULL,
+                    target_type VARCHAR(50) NOT NULL,
+                    target_id INTEGER,
+                    payload JSONB,
+                    ip_address VARCHAR(45),
+                    user_agent TEXT,
+                    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+                );
+                CREATE INDEX IF NOT EXISTS idx_admin_audit_logs_admin_id ON admin_audit_logs(admin_id);
+                CREATE INDEX IF NOT EXISTS idx_admin_audit_logs_created_at ON admin_audit_logs(created_at DESC);
+            """)
+            db_conn.commit()
+            logger.info("[MIGRATION] Successfully created admin_audit_logs table")
+
+        # Check if generations table has R2 storage columns (Migration 007)
+        cursor.execute("""
+            SELECT EXISTS (
+                SELECT FROM information_schema.columns
+                WHERE table_name = 'generations' AND column_name = 'result_r2_key'
+            )
+        """)
+        has_r2_columns = cursor.fetchone()[0]
+
+        if not has_r2_columns:
+            logger.info("[MIGRATION] Adding R2 storage columns to generations table...")
+            cursor.execute("""
+                ALTER TABLE generations ADD COLUMN IF NOT EXISTS result_r2_key TEXT;
+                ALTER TABLE generations ADD COLUMN IF NOT EXISTS result_r2_url TEXT;
+                ALTER TABLE generations ADD COLUMN IF NOT EXISTS thumbnail_url TEXT;
+                ALTER TABLE generations ADD COLUMN IF NOT EXISTS title VARCHAR(255);
+                ALTER TABLE generations ADD COLUMN IF NOT EXISTS is_favorite BOOLEAN DEFAULT FALSE;
+                ALTER TABLE generations ADD COLUMN IF NOT EXISTS r2_upload_size INTEGER;
+            """)
+            db_conn.commit()
+            logger.info("[MIGRATION] Successfully added R2 storage columns (result_r2_key, result_r2_url, thumbnail_url, title, is_favorite, r2_upload_size)")
+
+        # Try-on history covering index (Migrations 008/009)
+        if _build_index_concurrently(
+            db_conn,
+            "idx_generations_user_completed",
+            """
+            CREATE INDEX CONCURRENTLY idx_generations_user_completed
+                ON generations(user_id, created_at DESC, id DESC)
+                INCLUDE (category, person_image_url, garment_image_url, result_image_url,
+                         result_r2_url, thumbnail_url, title, is_favorite, updated_at)
+                WHERE status = 'completed'
+            """,
+        ):
+            # Superseded by the covering index
+            _run_outside_transaction(db_conn, "DROP INDEX CONCURRENTLY IF EXISTS idx_generations_user_status_created")
+
+        # Check if trigger-maintained stats table exists (Migration 010)
+        cursor.execute("""
+            SELECT EXISTS (
+                SELECT FROM pg_trigger
+                WHERE tgname = 'trg_generations_stats'
+            )
+        """)
+        has_stats_trigger = cursor.fetchone()[0]
+
+        if not has_stats_trigger:
+            logger.info("[MIGRATION] Creating user_category_stats table and trigger...")
+            migration_path = os.path.join(os.path.dirname(__file__), "migrations", "010_add_user_category_stats.sql")
+            with open(migration_path, encoding="utf-8") as f:
+                cursor.execute(f.read())
+            db_conn.commit()
+            logger.info("[MIGRATION] Successfully created user_category_stats (backfilled from generations)")
+
+        # Favorites partial index (Migration 011)
+        _build_index_concurrently(
+            db_conn,
+            "idx_generations_user_favorites",
+            """
+            CREATE INDEX CONCURRENTLY idx_generations_user_favorites
+                ON generations(user_id, created_at DESC, id DESC)
+                WHERE status = 'completed' AND is_favorite
+            """,
+        )
+
+        # Check if feedback has the background-notification flag (Migration 012)
+        cursor.execute("""
+            SELECT EXISTS (
+                SELECT FROM information_schema.columns
+                WHERE table_name = 'feedback' AND column_name = 'telegram_pending'
+            )
+        """)
+        has_telegram_pending = cursor.fetchone()[0]
+
+        if not has_telegram_pending:
+            logger.info("[MIGRATION] Adding telegram_pending column to feedback table...")
+            cursor.execute(
+                "ALTER TABLE feedback ADD COLUMN IF NOT EXISTS telegram_pending BOOLEAN NOT NULL DEFAULT FALSE"
+            )
+            db_conn.commit()
+            logger.info("[MIGRATION] Successfully added telegram_pending column")
+
+        cursor.close()
+    except Exception as e:
+        logger.warning(f"[MIGRATION] Auto-migration failed (non-critical): {e}")
+        # Don't fail startup if migration fails
+        try:
+            db_conn.rollback()
+        except Exception:
+            pass
+
+
+def run_migrations(database_url: str) -> bool:
+    """
+    Apply pending migrations under the migration advisory lock.
+
+    Args:
+        database_url: PostgreSQL connection string
+
+    Returns:
+        True if the migration step ran (individual failures are logged),
+        False if the database was unreachable
+    """
+    try:
+        db_conn = psycopg2.connect(database_url)
+    except Exception as e:
+        logger.error(f"[MIGRATION] Database connection failed: {e}")
+        return False
+
+    try:
+        cursor = db_conn.cursor()
+        # Blocks while another process migrates; it then finds nothing left to do
+        cursor.execute("SELECT pg_advisory_lock(%s)", (_MIGRATION_LOCK_ID,))
+        db_conn.commit()
+        try:
+            apply_pending_migrations(db_conn)
+        finally:
+            db_conn.rollback()
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (_MIGRATION_LOCK_ID,))
+            db_conn.commit()
+            cursor.close()
+        return True
+    finally:
+        db_conn.close()
+
+
+if __name__ == "__main__":
+    from backend.config import get_settings
+
+    sys.exit(0 if run_migrations(get_settings().database_url_str) else 1)
@@ -0,0 +1,6 @@
+-- Migration: Composite index for try-on history pagination
+-- Serves GET /api/user/tryons (WHERE user_id AND status ORDER BY created_at DESC, id DESC)
+-- as an index seek for both keyset (after_created_at/after_id) and offset pages
+
+CREATE INDEX IF NOT EXISTS idx_generations_user_status_created
+    ON generations(user_id, status, created_at DESC, id DESC);
@@ -0,0 +1,13 @@
+-- Migration: Covering partial index for try-on history listing
+-- GET /api/user/tryons only reads completed generations, and every column it selects
+-- is in the index, so the planner can answer it with an Index Only Scan (no heap visits).
+-- Supersedes idx_generations_user_status_created from migration 008.
+-- CONCURRENTLY must run outside a transaction block.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_generations_user_completed
+    ON generations(user_id, created_at DESC, id DESC)
+    INCLUDE (category, person_image_url, garment_image_url, result_image_url,
+             result_r2_url, thumbnail_url, title, is_favorite, updated_at)
+    WHERE status = 'completed';
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_generations_user_status_created;
@@ -0,0 +1,80 @@
+-- Migration: Trigger-maintained per-user, per-category try-on stats
+-- GET /api/user/tryons/stats reads a handful of summary rows instead of aggregating
+-- all of the user's generations. Triggers keep the table exact on every write, so
+-- there is no refresh lag (unlike a periodically refreshed materialized view).
+-- NULL categories are stored as '' so (user_id, category) can be the primary key.
+-- No FK to users: rows are adjusted by the generations ON DELETE CASCADE itself.
+
+CREATE TABLE IF NOT EXISTS user_category_stats (
+    user_id INTEGER NOT NULL,
+    category VARCHAR(50) NOT NULL DEFAULT '',
+    completed_count INTEGER NOT NULL DEFAULT 0,   -- status = 'completed'
+    favorite_count INTEGER NOT NULL DEFAULT 0,    -- completed AND is_favorite
+    storage_bytes BIGINT NOT NULL DEFAULT 0,      -- r2_upload_size, any status
+    PRIMARY KEY (user_id, category)
+);
+
+CREATE OR REPLACE FUNCTION user_category_stats_apply(
+    p_user_id INTEGER, p_category VARCHAR, p_status VARCHAR,
+    p_is_favorite BOOLEAN, p_size INTEGER, p_sign INTEGER
+) RETURNS VOID AS $$
+BEGIN
+    IF p_user_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO user_category_stats AS s (user_id, category, completed_count, favorite_count, storage_bytes)
+    VALUES (
+        p_user_id,
+        COALESCE(p_category, ''),
+        p_sign * COALESCE(p_status = 'completed', FALSE)::INTEGER,
+        p_sign * COALESCE(p_status = 'completed' AND p_is_favorite, FALSE)::INTEGER,
+        p_sign * COALESCE(p_size, 0)
+    )
+    ON CONFLICT (user_id, category) DO UPDATE SET
+        completed_count = s.completed_count + EXCLUDED.completed_count,
+        favorite_count = s.favorite_count + EXCLUDED.favorite_count,
+        storage_bytes = s.storage_bytes + EXCLUDED.storage_bytes;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION generations_stats_trigger() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM user_category_stats_apply(
+            OLD.user_id, OLD.category, OLD.status, OLD.is_favorite, OLD.r2_upload_size, -1
+        );
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM user_category_stats_apply(
+            NEW.user_id, NEW.category, NEW.status, NEW.is_favorite, NEW.r2_upload_size, 1
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger creation locks generations against writes until COMMIT, so the backfill
+-- below and the trigger never double-count or miss a row
+BEGIN;
+
+DROP TRIGGER IF EXISTS trg_generations_stats ON generations;
+CREATE TRIGGER trg_generations_stats
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, category, status, is_favorite, r2_upload_size
+    ON generations
+    FOR EACH ROW EXECUTE FUNCTION generations_stats_trigger();
+
+TRUNCATE user_category_stats;
+INSERT INTO user_category_stats (user_id, category, completed_count, favorite_count, storage_bytes)
+SELECT user_id,
+       COALESCE(category, ''),
+       COUNT(*) FILTER (WHERE status = 'completed'),
+       COUNT(*) FILTER (WHERE status = 'completed' AND is_favorite = TRUE),
+       COALESCE(SUM(r2_upload_size), 0)
+FROM generations
+WHERE user_id IS NOT NULL
+GROUP BY user_id, COALESCE(category, '');
+
+COMMIT;
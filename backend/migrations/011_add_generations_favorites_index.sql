@@ -0,0 +1,9 @@
+-- Migration: Partial index for the favorites filter of the try-on history
+-- GET /api/user/tryons?favorites=1 only touches a user's favorited completed generations;
+-- this index holds just those rows, in listing order, so the filter doesn't walk every
+-- completed row of the user. The favorites count itself comes from user_category_stats
+-- (migration 010). CONCURRENTLY must run outside a transaction block.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_generations_user_favorites
+    ON generations(user_id, created_at DESC, id DESC)
+    WHERE status = 'completed' AND is_favorite;
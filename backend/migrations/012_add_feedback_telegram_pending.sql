@@ -0,0 +1,6 @@
+-- Migration: Mark feedback whose Telegram notification is queued in the background
+-- FeedbackService sends new feedback to Telegram after the request returns; while the
+-- send is pending, /api/feedback/retry-telegram must not pick the row up and send it
+-- a second time. Rows left pending by a worker that died are retried after a grace period.
+
+ALTER TABLE feedback ADD COLUMN IF NOT EXISTS telegram_pending BOOLEAN NOT NULL DEFAULT FALSE;
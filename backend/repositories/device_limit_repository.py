@@ -255,6 +255,58 @@ class DeviceLimitRepository:
             logger.error(f"Error incrementing usage: {e}", exc_info=True)
             raise
 
+    def consume_if_available(
+        self, device_fingerprint: str, ip_address: str, limit_date: date, limit: int, increment: int = 1
+    ) -> Optional[int]:
+        """
+        Atomically increment generations_used only if the limit allows it.
+
+        Check and increment happen in one conditional UPDATE, so concurrent
+        requests from the same device cannot both pass the check.
+        The record must already exist (see create_or_reset_record).
+
+        Args:
+            device_fingerprint: Unique device identifier
+            ip_address: Client IP address
+            limit_date: Date to increment for
+            limit: Maximum allowed generations for the date
+            increment: Amount to consume (default: 1)
+
+        Returns:
+            Updated generations_used, or None if the limit is reached
+
+        Raises:
+            Exception: If database operation fails
+        """
+        try:
+            cursor = self.db.cursor()
+
+            cursor.execute(
+                """
+                UPDATE device_limits
+                SET generations_used = generations_used + %s,
+                    last_used_at = NOW(),
+                    updated_at = NOW()
+                WHERE device_fingerprint = %s
+                  AND ip_address = %s
+                  AND limit_date = %s
+                  AND generations_used + %s <= %s
+                RETURNING generations_used
+                """,
+                (increment, device_fingerprint, ip_address, limit_date, increment, limit),
+            )
+
+            row = cursor.fetchone()
+            self.db.commit()
+            cursor.close()
+
+            return row[0] if row else None
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error consuming usage: {e}", exc_info=True)
+            raise
+
     def calculate_total_usage(
         self, device_fingerprint: str, ip_address: str, limit_date: date
     ) -> int:
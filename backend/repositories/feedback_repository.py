@@ -1,21 +1,77 @@
-"""Feedback repository with dual storage (PostgreSQL primary, JSON files backup)."""
+"""Feedback repository with dual storage (PostgreSQL primary, NDJSON file backup)."""
 
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
 
 from backend.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Backups are appended off the request thread; one writer keeps them in order
+_BACKUP_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="FeedbackBackup")
+
+# Append-only backup, one JSON object per line. Older deployments wrote one
+# feedback_*.json file per feedback; those are still read by the file fallback.
+_BACKUP_FILENAME = "feedback.ndjson"
+
+# Feedback still marked telegram_pending after this long was queued by a worker that
+# died before sending; get_unsent_telegram() hands it out for retry again
+_PENDING_GRACE_MINUTES = 5
+
+# Block size for scanning the NDJSON backup (counting lines, reading from the end)
+_READ_BLOCK_SIZE = 64 * 1024
+
+
+def _append_backup_line(fd: int, file_path: str, line: bytes) -> None:
+    """Append one feedback line to the backup (runs on _BACKUP_WRITER, errors are only logged)."""
+    try:
+        # O_APPEND makes each small write land whole at the end, even across workers
+        os.write(fd, line)
+    except Exception as e:
+        logger.error(f"Failed to append feedback to {file_path}: {e}", exc_info=True)
+
+
+def _count_lines(f) -> int:
+    """Count newline-terminated lines of a binary file without decoding them."""
+    f.seek(0)
+    return sum(block.count(b"\n") for block in iter(lambda: f.read(_READ_BLOCK_SIZE), b""))
+
+
+def _tail_lines(f, count: int) -> List[bytes]:
+    """
+    Read the last `count` lines of a binary file, scanning backwards from EOF.
+
+    Returns:
+        Lines without their newlines, oldest first
+    """
+    if count <= 0:
+        return []
+
+    position = f.seek(0, os.SEEK_END)
+    data = b""
+    # count + 1 newlines guarantee `count` complete lines (the last line ends with one)
+    while position > 0 and data.count(b"\n") <= count:
+        read_size = min(_READ_BLOCK_SIZE, position)
+        position -= read_size
+        f.seek(position)
+        data = f.read(read_size) + data
+
+    lines = data.splitlines()
+    if position > 0:
+        lines = lines[1:]  # First line may start before the block that was read
+    return lines[-count:]
+
 
 class FeedbackRepository:
     """
     Feedback storage with dual persistence strategy.
 
     Primary: PostgreSQL database (if available)
-    Fallback: JSON files in feedback folder
+    Fallback: append-only NDJSON file in feedback folder
 
     This ensures feedback is never lost even if DB is temporarily unavailable.
     """
@@ -26,7 +82,7 @@ class FeedbackRepository:
 
         Args:
             db_connection: psycopg2 connection object (can be None)
-            feedback_folder: Path to folder for JSON file backups
+            feedback_folder: Path to folder for the NDJSON backup
         """
         self.db = db_connection
         self.feedback_folder = feedback_folder
@@ -34,6 +90,15 @@ class FeedbackRepository:
         # Ensure feedback folder exists
         os.makedirs(feedback_folder, exist_ok=True)
 
+        # Kept open for the life of the process (one descriptor, no per-feedback open/close).
+        # An unwritable folder only disables the backup; feedback still goes to the database.
+        self.backup_path = os.path.join(feedback_folder, _BACKUP_FILENAME)
+        try:
+            self._backup_fd = os.open(self.backup_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        except OSError as e:
+            logger.error(f"Feedback file backup disabled - cannot open {self.backup_path}: {e}")
+            self._backup_fd = None
+
     def is_db_available(self) -> bool:
         """Check if database is available for feedback storage."""
         if self.db is None:
@@ -54,6 +119,7 @@ class FeedbackRepository:
         session_id: Optional[str],
         ip_address: str,
         telegram_sent: bool = False,
+        telegram_pending: bool = False,
     ) -> Dict[str, Any]:
         """
         Save feedback to database and file backup.
@@ -69,6 +135,8 @@ class FeedbackRepository:
             session_id: Session identifier (optional)
             ip_address: Client IP address
             telegram_sent: Whether notification was sent to Telegram
+            telegram_pending: Whether a background Telegram send is queued
+                (retries skip the record until mark_telegram_sent())
 
         Returns:
             Feedback record dictionary:
@@ -100,17 +168,17 @@ class FeedbackRepository:
         if self.is_db_available():
             try:
                 db_id = self._save_to_db(
-                    rating, comment, session_id, ip_address, telegram_sent
+                    rating, comment, session_id, ip_address, telegram_sent, telegram_pending
                 )
                 db_success = True
-                logger.info(f"Feedback saved to database (ID: {db_id})")
+                logger.debug("Feedback saved to database (ID: %s)", db_id)
             except Exception as e:
                 logger.error(f"Failed to save feedback to database: {e}", exc_info=True)
 
         # Always save to file (backup)
         try:
             file_path = self._save_to_file(feedback_data)
-            logger.info(f"Feedback saved to file: {file_path}")
+            logger.debug("Feedback queued for file backup: %s", file_path)
         except Exception as e:
             logger.error(f"Failed to save feedback to file: {e}", exc_info=True)
             file_path = None
@@ -134,6 +202,7 @@ class FeedbackRepository:
         session_id: Optional[str],
         ip_address: str,
         telegram_sent: bool,
+        telegram_pending: bool,
     ) -> int:
         """
         Save feedback to PostgreSQL database.
@@ -149,11 +218,11 @@ class FeedbackRepository:
         cursor.execute(
             """
             INSERT INTO feedback
-                (rating, comment, session_id, ip_address, telegram_sent)
-            VALUES (%s, %s, %s, %s, %s)
+                (rating, comment, session_id, ip_address, telegram_sent, telegram_pending)
+            VALUES (%s, %s, %s, %s, %s, %s)
             RETURNING id
             """,
-            (rating, comment, session_id, ip_address, telegram_sent),
+            (rating, comment, session_id, ip_address, telegram_sent, telegram_pending),
         )
 
         feedback_id = cursor.fetchone()[0]
@@ -164,26 +233,29 @@ class FeedbackRepository:
 
     def _save_to_file(self, feedback_data: Dict[str, Any]) -> str:
         """
-        Save feedback to JSON file.
+        Append feedback to the NDJSON backup file.
+
+        The data is serialized here and appended in the background, so the
+        request doesn't wait on file I/O.
 
         Args:
             feedback_data: Feedback dictionary
 
         Returns:
-            Path to saved JSON file
+            Path of the backup file
 
         Raises:
-            Exception: If file write fails
+            OSError: If the backup file could not be opened
+            Exception: If serialization or queuing fails
         """
-        # Generate unique filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        filename = f"feedback_{timestamp}.json"
-        file_path = os.path.join(self.feedback_folder, filename)
+        if self._backup_fd is None:
+            raise OSError(f"Backup file {self.backup_path} is not open")
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(feedback_data, f, indent=2, ensure_ascii=False)
+        # orjson emits UTF-8 bytes (non-ASCII kept as-is) with the trailing newline included
+        line = orjson.dumps(feedback_data, option=orjson.OPT_APPEND_NEWLINE)
+        _BACKUP_WRITER.submit(_append_backup_line, self._backup_fd, self.backup_path, line)
 
-        return file_path
+        return self.backup_path
 
     def list_all(self, limit: int = 100) -> Dict[str, Any]:
         """
@@ -218,11 +290,11 @@ class FeedbackRepository:
 
         # Fallback to files
         try:
-            feedback_list = self._load_from_files()
+            total, feedback_list = self._load_from_files(limit)
             return {
                 "source": "files",
-                "count": len(feedback_list),
-                "feedback": feedback_list[:limit],  # Apply limit
+                "count": total,
+                "feedback": feedback_list,
             }
         except Exception as e:
             logger.error(f"Failed to load feedback from files: {e}", exc_info=True)
@@ -272,24 +344,48 @@ class FeedbackRepository:
             for row in rows
         ]
 
-    def _load_from_files(self) -> List[Dict[str, Any]]:
+    def _load_from_files(self, limit: int) -> Tuple[int, List[Dict[str, Any]]]:
         """
-        Load all feedback from JSON files.
+        Load the newest feedback from the NDJSON backup (and older per-file backups).
+
+        Only the last `limit` lines of the NDJSON file are read (backwards from
+        EOF) and parsed; the total is a newline count. If the file holds fewer
+        lines, the rest comes from legacy feedback_*.json files, whose names
+        start with the save time so they sort by name.
+
+        Args:
+            limit: Maximum records
 
         Returns:
-            List of feedback dictionaries, sorted by created_at (newest first)
+            Tuple of (total number of backed-up feedbacks, feedback dictionaries
+            sorted by created_at, newest first)
         """
+        try:
+            with open(self.backup_path, "rb") as f:
+                line_count = _count_lines(f)
+                lines = _tail_lines(f, limit)
+        except FileNotFoundError:
+            line_count = 0
+            lines = []
+
         feedback_list = []
 
-        for filename in os.listdir(self.feedback_folder):
-            if not filename.endswith(".json"):
-                continue
+        for line in reversed(lines):
+            try:
+                feedback_list.append(orjson.loads(line))
+            except orjson.JSONDecodeError as e:
+                logger.error(f"Skipping malformed line in {self.backup_path}: {e}")
 
+        filenames = sorted(
+            (name for name in os.listdir(self.feedback_folder) if name.endswith(".json")), reverse=True
+        )
+
+        for filename in filenames[: max(limit - len(feedback_list), 0)]:
             file_path = os.path.join(self.feedback_folder, filename)
 
             try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                with open(file_path, "rb") as f:
+                    data = orjson.loads(f.read())
                     data["file_path"] = file_path
                     feedback_list.append(data)
             except Exception as e:
@@ -298,13 +394,15 @@ class FeedbackRepository:
         # Sort by created_at (newest first)
         feedback_list.sort(key=lambda x: x.get("created_at", ""), reverse=True)
 
-        return feedback_list
+        return line_count + len(filenames), feedback_list
 
     def get_unsent_telegram(self) -> List[Dict[str, Any]]:
         """
         Get feedback records not yet sent to Telegram.
 
-        Only works with database source.
+        Only works with database source. Records with a background send in
+        progress (telegram_pending) are skipped unless they have been pending
+        for over _PENDING_GRACE_MINUTES.
 
         Returns:
             List of unsent feedback records
@@ -321,8 +419,10 @@ class FeedbackRepository:
                 SELECT id, rating, comment, session_id, ip_address, created_at
                 FROM feedback
                 WHERE telegram_sent = FALSE
+                  AND (NOT telegram_pending OR created_at < NOW() - make_interval(mins => %s))
                 ORDER BY created_at ASC
-                """
+                """,
+                (_PENDING_GRACE_MINUTES,),
             )
 
             rows = cursor.fetchall()
@@ -344,6 +444,17 @@ class FeedbackRepository:
             logger.error(f"Error getting unsent Telegram feedback: {e}", exc_info=True)
             return []
 
+    def release_connection(self) -> None:
+        """
+        Return the calling thread's pooled database connection.
+
+        Background tasks call this when done; request threads release theirs
+        automatically at app context teardown.
+        """
+        release = getattr(self.db, "release", None)
+        if release is not None:
+            release()
+
     def mark_telegram_sent(
         self, feedback_id: int, success: bool, error_message: Optional[str] = None
     ):
@@ -369,7 +480,8 @@ class FeedbackRepository:
                 """
                 UPDATE feedback
                 SET telegram_sent = %s,
-                    telegram_error = %s
+                    telegram_error = %s,
+                    telegram_pending = FALSE
                 WHERE id = %s
                 """,
                 (success, error_message, feedback_id),
@@ -378,7 +490,7 @@ class FeedbackRepository:
             self.db.commit()
             cursor.close()
 
-            logger.debug(f"Marked feedback {feedback_id} as Telegram sent={success}")
+            logger.debug("Marked feedback %s as Telegram sent=%s", feedback_id, success)
 
         except Exception as e:
             self.db.rollback()
@@ -2,6 +2,8 @@
 
 from typing import Any, Dict, List, Optional
 
+from psycopg2.extras import execute_values
+
 from backend.logger import get_logger
 
 logger = get_logger(__name__)
@@ -303,6 +305,61 @@ class GenerationRepository:
             logger.error(f"Error setting title for generation {generation_id}: {e}", exc_info=True)
             return False
 
+    def bulk_update(self, user_id: int, updates: List[Dict[str, Any]]) -> List[int]:
+        """
+        Update favorite flag and/or title of several generations in one statement.
+
+        Args:
+            user_id: User ID (for ownership verification)
+            updates: Items like {"id": int, "is_favorite": bool | None, "title": str | None};
+                     None leaves the field unchanged. Items repeating an id are
+                     applied in order (later values win).
+
+        Returns:
+            IDs of generations that were updated (owned by user)
+        """
+        if not updates:
+            return []
+
+        # UPDATE ... FROM joins every VALUES row with the same id and applies an arbitrary
+        # one, so duplicates are merged into a single row first
+        merged: Dict[int, Dict[str, Any]] = {}
+        for u in updates:
+            row = merged.setdefault(u["id"], {"is_favorite": None, "title": None})
+            for field in ("is_favorite", "title"):
+                if u.get(field) is not None:
+                    row[field] = u[field]
+
+        try:
+            cursor = self.db.cursor()
+
+            rows = execute_values(
+                cursor,
+                """
+                UPDATE generations AS g
+                SET is_favorite = COALESCE(v.is_favorite, g.is_favorite),
+                    title = COALESCE(v.title, g.title),
+                    updated_at = NOW()
+                FROM (VALUES %s) AS v(id, is_favorite, title, user_id)
+                WHERE g.id = v.id AND g.user_id = v.user_id
+                RETURNING g.id
+                """,
+                [(item_id, u["is_favorite"], u["title"], user_id) for item_id, u in merged.items()],
+                template="(%s::integer, %s::boolean, %s::varchar, %s::integer)",
+                page_size=len(merged),
+                fetch=True,
+            )
+
+            self.db.commit()
+            cursor.close()
+
+            return [row[0] for row in rows]
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error bulk updating generations for user {user_id}: {e}", exc_info=True)
+            raise
+
     def list_by_user(
         self, user_id: int, limit: int = 100, offset: int = 0
     ) -> List[Dict[str, Any]]:
@@ -13,9 +13,11 @@ Security:
 - Audit trail for all mutations
 """
 
+import json
 from typing import Dict, List, Optional
 
 from backend.logger import get_logger
+from backend.utils.db_helpers import db_transaction
 
 logger = get_logger(__name__)
 
@@ -71,8 +73,6 @@ class AdminService:
             raise ValueError("Admin service not available")
 
         try:
-            from backend.utils.db_helpers import db_transaction
-
             # Count total users
             with db_transaction(self.db) as cursor:
                 cursor.execute("SELECT COUNT(*) FROM users")
@@ -618,8 +618,6 @@ class AdminService:
             ip_address: IP address of admin
         """
         try:
-            import json
-
             cursor.execute(
                 """
                 INSERT INTO admin_audit_logs
@@ -1,5 +1,8 @@
 """Feedback collection and notification service."""
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 
 from backend.logger import get_logger
@@ -8,6 +11,15 @@ from backend.services.notification_service import NotificationService
 
 logger = get_logger(__name__)
 
+# Precomputed lookup for the common rating encodings (int 1-5 and "1"-"5")
+_RATING_LUT = {**{i: i for i in range(1, 6)}, **{str(i): i for i in range(1, 6)}}
+
+# Telegram notifications for new feedback are sent in the background, so the
+# request returns right after the feedback is saved. Feedback arriving within
+# _NOTIFY_BATCH_WINDOW seconds (or while a send is in progress) goes out together.
+_NOTIFY_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="FeedbackNotify")
+_NOTIFY_BATCH_WINDOW = 0.5
+
 
 class FeedbackService:
     """
@@ -38,6 +50,11 @@ class FeedbackService:
         self.notification_service = notification_service
         self.logger = get_logger(__name__)
 
+        # Feedback waiting for the next batched Telegram notification
+        self._pending_notifications: List[Dict] = []
+        self._notify_lock = threading.Lock()
+        self._flush_scheduled = False
+
     def submit_feedback(
         self, rating: int, comment: str, session_id: Optional[str], ip_address: str
     ) -> Dict[str, any]:
@@ -47,8 +64,8 @@ class FeedbackService:
         Workflow:
         1. Validate rating (1-5)
         2. Save to database/file (via FeedbackRepository)
-        3. Send Telegram notification (if configured)
-        4. Update database with Telegram status
+        3. Queue Telegram notification (if configured); the background task
+           updates the database with the Telegram status
 
         Args:
             rating: Rating (1-5)
@@ -64,8 +81,7 @@ class FeedbackService:
                 'feedback_id': int or None,
                 'saved_to': 'database' or 'files',
                 'db_saved': bool,
-                'telegram_sent': bool (if configured),
-                'telegram_error': str (if failed)
+                'telegram_queued': bool (if configured)
             }
 
         Raises:
@@ -79,48 +95,36 @@ class FeedbackService:
         if not comment or not comment.strip():
             comment = "[Без комментария]"
 
-        self.logger.info(f"Submitting feedback: rating={rating}/5, comment_length={len(comment)}")
+        self.logger.debug("Submitting feedback: rating=%d/5, comment_length=%d", rating, len(comment))
+
+        telegram_enabled = bool(self.notification_service and self.notification_service.is_enabled())
 
-        # Save feedback (with telegram_sent=False initially)
+        # Save feedback (telegram_sent=False initially; telegram_pending keeps retries
+        # from resending it while the background notification is queued)
         feedback_record = self.feedback_repo.save(
-            rating=rating, comment=comment, session_id=session_id, ip_address=ip_address, telegram_sent=False
+            rating=rating,
+            comment=comment,
+            session_id=session_id,
+            ip_address=ip_address,
+            telegram_sent=False,
+            telegram_pending=telegram_enabled,
         )
 
         feedback_id = feedback_record.get("id")
         db_saved = feedback_record.get("db_saved", False)
 
         self.logger.info(
-            f"Feedback saved: id={feedback_id}, db_saved={db_saved}, file_path={feedback_record.get('file_path')}"
+            "Feedback saved: id=%s, db_saved=%s, file_path=%s", feedback_id, db_saved, feedback_record.get("file_path")
         )
 
-        # Try to send Telegram notification
-        telegram_sent = False
-        telegram_error = None
-
-        if self.notification_service and self.notification_service.is_enabled():
-            self.logger.info("Sending Telegram notification for feedback...")
-
-            success, error = self.notification_service.send_feedback_notification(
-                rating=rating, comment=comment, session_id=session_id, max_retries=3
+        # Queue Telegram notification (failed ones stay telegram_sent=FALSE for retry)
+        if telegram_enabled:
+            self.logger.debug("Queueing Telegram notification for feedback...")
+            self._queue_notification(
+                {"id": feedback_id, "rating": rating, "comment": comment, "session_id": session_id}
             )
-
-            telegram_sent = success
-            telegram_error = error
-
-            # Update database with Telegram status
-            if feedback_id:
-                try:
-                    self.feedback_repo.mark_telegram_sent(feedback_id, success, error)
-                    self.logger.info(f"Updated Telegram status for feedback {feedback_id}: sent={success}")
-                except Exception as e:
-                    self.logger.error(f"Failed to update Telegram status: {e}")
-
-            if success:
-                self.logger.info("Telegram notification sent successfully")
-            else:
-                self.logger.warning(f"Telegram notification failed: {error}")
         else:
-            self.logger.info("Telegram notifications not configured - skipping")
+            self.logger.debug("Telegram notifications not configured - skipping")
 
         # Build response
         response = {
@@ -131,14 +135,62 @@ class FeedbackService:
             "db_saved": db_saved,
         }
 
-        # Add Telegram status if attempted
-        if self.notification_service and self.notification_service.is_enabled():
-            response["telegram_sent"] = telegram_sent
-            if not telegram_sent:
-                response["telegram_error"] = telegram_error
+        if telegram_enabled:
+            response["telegram_queued"] = True
 
         return response
 
+    def _queue_notification(self, feedback: Dict) -> None:
+        """
+        Add saved feedback to the next Telegram batch, scheduling a flush if needed.
+
+        Args:
+            feedback: Dict with 'id' (None if only saved to file), 'rating',
+                'comment' and 'session_id'
+        """
+        with self._notify_lock:
+            self._pending_notifications.append(feedback)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+
+        _NOTIFY_POOL.submit(self._flush_notifications)
+
+    def _flush_notifications(self) -> None:
+        """
+        Send pending feedback to Telegram and record the outcome per feedback.
+
+        Runs on _NOTIFY_POOL, so errors are logged rather than raised. Database
+        updates use the thread's own pooled connection, returned when done.
+        """
+        time.sleep(_NOTIFY_BATCH_WINDOW)
+
+        with self._notify_lock:
+            batch = self._pending_notifications
+            self._pending_notifications = []
+            self._flush_scheduled = False
+
+        try:
+            results = self.notification_service.send_feedback_batch_notification(batch, max_retries=3)
+        except Exception as e:
+            self.logger.error(f"Telegram notification for {len(batch)} feedback(s) failed: {e}", exc_info=True)
+            results = [(False, str(e))] * len(batch)
+
+        # Update database with Telegram status (also clears telegram_pending)
+        try:
+            for feedback, (success, error) in zip(batch, results):
+                if not success:
+                    self.logger.warning(f"Telegram notification failed: {error}")
+
+                if feedback["id"]:
+                    try:
+                        self.feedback_repo.mark_telegram_sent(feedback["id"], success, error)
+                        self.logger.debug("Updated Telegram status for feedback %s: sent=%s", feedback["id"], success)
+                    except Exception as e:
+                        self.logger.error(f"Failed to update Telegram status: {e}")
+        finally:
+            self.feedback_repo.release_connection()
+
     def list_feedback(self, limit: int = 100) -> Dict[str, any]:
         """
         Retrieve all feedback.
@@ -154,11 +206,11 @@ class FeedbackService:
                 'feedback': List[Dict]
             }
         """
-        self.logger.info(f"Retrieving feedback list (limit={limit})...")
+        self.logger.debug("Retrieving feedback list (limit=%d)...", limit)
 
         result = self.feedback_repo.list_all(limit)
 
-        self.logger.info(f"Retrieved {result['count']} feedback records from {result['source']}")
+        self.logger.debug("Retrieved %d feedback records from %s", result["count"], result["source"])
 
         return result
 
@@ -213,11 +265,19 @@ class FeedbackService:
         Raises:
             ValueError: If rating cannot be parsed or is out of range
         """
+        # If rating is a list, take first element
+        if isinstance(rating_value, list) and len(rating_value) > 0:
+            rating_value = rating_value[0]
+
+        # Fast path: single dict lookup for well-formed values
         try:
-            # If rating is a list, take first element
-            if isinstance(rating_value, list) and len(rating_value) > 0:
-                rating_value = rating_value[0]
+            rating = _RATING_LUT.get(rating_value)
+        except TypeError:  # unhashable value
+            rating = None
+        if rating is not None:
+            return rating
 
+        try:
             # If rating is a string, convert to int
             if isinstance(rating_value, str):
                 rating_value = int(rating_value.strip())
@@ -5,7 +5,10 @@ Handles Google OAuth flow: authorization URL generation, token exchange,
 user profile retrieval, and user creation/login.
 """
 
+import hashlib
+import hmac
 import secrets
+import time
 from typing import Dict, Optional, Tuple
 from urllib.parse import urlencode
 
@@ -38,6 +41,9 @@ class GoogleAuthService:
         "https://www.googleapis.com/auth/userinfo.profile",
     ]
 
+    # Lifetime of a signed OAuth state token (user must return from Google within this window)
+    STATE_TTL_SECONDS = 600
+
     def __init__(
         self,
         settings: Settings,
@@ -53,6 +59,7 @@ class GoogleAuthService:
         self.settings = settings
         self.auth_manager = auth_manager
         self.logger = get_logger(__name__)
+        self._state_secret = settings.jwt_secret_key.encode("utf-8")
 
         # Validate configuration
         if not settings.google_oauth_enabled:
@@ -83,11 +90,70 @@ class GoogleAuthService:
         """
         Check if Google OAuth is properly configured and enabled.
 
+        Enablement is resolved once in __init__ (settings are immutable after
+        startup), so this is a plain attribute read and safe on hot paths.
+
         Returns:
             True if Google OAuth is ready, False otherwise
         """
         return self.enabled
 
+    def _sign_state_payload(self, payload: str) -> str:
+        """Return URL-safe HMAC-SHA256 signature for a state payload."""
+        return hmac.new(self._state_secret, payload.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def create_state(self) -> str:
+        """
+        Create a signed state token for CSRF protection.
+
+        Format: ``<nonce>.<issued_at>.<signature>``. The signature and expiry are
+        verified on callback without server-side storage; the nonce (see
+        state_nonce) must also be stored in a short-lived cookie so the state is
+        bound to the browser that started the login.
+
+        Returns:
+            Signed state token
+        """
+        payload = f"{secrets.token_urlsafe(24)}.{int(time.time())}"
+        return f"{payload}.{self._sign_state_payload(payload)}"
+
+    @staticmethod
+    def state_nonce(state: str) -> str:
+        """Return the random nonce part of a state token from create_state()."""
+        return state.split(".", 1)[0]
+
+    def verify_state(self, state: str, expected_nonce: Optional[str]) -> bool:
+        """
+        Verify a state token from create_state() against the browser's nonce.
+
+        Args:
+            state: State token received in OAuth callback
+            expected_nonce: Nonce stored in the browser's state cookie at login
+
+        Returns:
+            True if the token was issued by this service for this browser
+            and has not expired
+        """
+        if not expected_nonce:
+            return False
+
+        try:
+            payload, signature = state.rsplit(".", 1)
+            nonce, issued_at = payload.split(".")
+            issued_at = int(issued_at)
+        except (AttributeError, ValueError):
+            return False
+
+        # Compare bytes: compare_digest raises TypeError on non-ASCII str
+        expected_signature = self._sign_state_payload(payload).encode("utf-8")
+        if not hmac.compare_digest(signature.encode("utf-8"), expected_signature):
+            return False
+
+        if not hmac.compare_digest(nonce.encode("utf-8"), expected_nonce.encode("utf-8")):
+            return False
+
+        return 0 <= time.time() - issued_at <= self.STATE_TTL_SECONDS
+
     def generate_authorization_url(self) -> Tuple[str, str]:
         """
         Generate Google OAuth authorization URL with state token.
@@ -95,7 +161,7 @@ class GoogleAuthService:
         Returns:
             Tuple of (authorization_url, state_token)
             - authorization_url: URL to redirect user to Google login
-            - state_token: Random state token for CSRF protection (store in session)
+            - state_token: Signed state token for CSRF protection (see verify_state)
 
         Raises:
             RuntimeError: If Google OAuth is not enabled
@@ -103,8 +169,8 @@ class GoogleAuthService:
         if not self.is_enabled():
             raise RuntimeError("Google OAuth is not enabled or misconfigured")
 
-        # Generate random state for CSRF protection
-        state = secrets.token_urlsafe(32)
+        # Generate signed state for CSRF protection (verified statelessly on callback)
+        state = self.create_state()
 
         try:
             # Create OAuth 2.0 flow
@@ -148,7 +214,7 @@ class GoogleAuthService:
         Args:
             authorization_code: Authorization code from Google callback
             state: State token from callback
-            expected_state: Expected state token (from session)
+            expected_state: Expected state token to compare against
 
         Returns:
             Dictionary with token information:
@@ -167,13 +233,21 @@ class GoogleAuthService:
             raise RuntimeError("Google OAuth is not enabled or misconfigured")
 
         # Validate state (CSRF protection)
-        if state != expected_state:
+        if not hmac.compare_digest(state.encode("utf-8"), expected_state.encode("utf-8")):
             self.logger.error(
                 f"[GOOGLE-AUTH] State mismatch: received={state[:8]}..., "
                 f"expected={expected_state[:8]}..."
             )
             raise ValueError("Invalid state token (CSRF protection)")
 
+        return self._fetch_token(authorization_code, state)
+
+    def _fetch_token(self, authorization_code: str, state: str) -> Dict:
+        """
+        Exchange authorization code for tokens without validating state.
+
+        Callers must validate state first (exchange_code_for_token or verify_state).
+        """
         try:
             # Create OAuth 2.0 flow
             flow = Flow.from_client_config(
@@ -348,7 +422,7 @@ class GoogleAuthService:
         Args:
             authorization_code: Authorization code from Google callback
             state: State token from callback
-            expected_state: Expected state token (from session)
+            expected_state: Expected state token to compare against
 
         Returns:
             Dictionary with user data and JWT token (same as find_or_create_user)
@@ -365,6 +439,37 @@ class GoogleAuthService:
         # Step 1: Exchange code for tokens
         token_data = self.exchange_code_for_token(authorization_code, state, expected_state)
 
+        return self._complete_oauth_callback(token_data)
+
+    def handle_oauth_callback_verified(self, authorization_code: str, state: str) -> Dict:
+        """
+        Complete OAuth flow for a state already validated with verify_state().
+
+        Same as handle_oauth_callback() but skips the redundant state comparison.
+
+        Args:
+            authorization_code: Authorization code from Google callback
+            state: Signed state token from callback (already verified)
+
+        Returns:
+            Dictionary with user data and JWT token (same as find_or_create_user)
+
+        Raises:
+            ValueError: If any step in the OAuth flow fails
+            RuntimeError: If Google OAuth is not properly configured
+        """
+        if not self.is_enabled():
+            raise RuntimeError("Google OAuth is not enabled or misconfigured")
+
+        self.logger.info("[GOOGLE-AUTH] Starting OAuth callback handling...")
+
+        # Step 1: Exchange code for tokens
+        token_data = self._fetch_token(authorization_code, state)
+
+        return self._complete_oauth_callback(token_data)
+
+    def _complete_oauth_callback(self, token_data: Dict) -> Dict:
+        """Resolve user info from exchanged tokens and find/create the user."""
         # Step 2: Extract user info from ID token
         user_info = self.get_user_info(token_data["id_token"])
 
@@ -1,17 +1,34 @@
 """Image processing and validation service."""
 
-import base64
+import mmap
 import os
-from typing import Dict, List, Optional, Set, Tuple
+import tempfile
+from typing import IO, Dict, FrozenSet, List, Optional, Tuple
 
+import PIL
+import pybase64
 import requests
 from flask import Request
-from PIL import Image
+from PIL import Image, ImageStat, features
 
 from backend.logger import get_logger
+from backend.utils.cache_helpers import TTLCache
 
 logger = get_logger(__name__)
 
+# EXIF tag holding the camera orientation (1 = upright)
+_EXIF_ORIENTATION = 0x0112
+
+# How long preprocessing results are remembered per source path (uploads are
+# cleaned up after an hour, so entries must expire well before that)
+_PREPROCESSED_TTL_SECONDS = 30 * 60
+
+# Longest data URL header save_base64_image() looks for ("data:image/jpeg;base64,")
+_DATA_URL_PREFIX_MAX = 64
+
+# Pillow's resize() reducing_gap: 3.0 is indistinguishable from plain resampling
+_REDUCING_GAP = 3.0
+
 
 class ImageService:
     """
@@ -27,7 +44,7 @@ class ImageService:
     No direct database or external API calls.
     """
 
-    ALLOWED_EXTENSIONS: Set[str] = {"png", "jpg", "jpeg"}
+    ALLOWED_EXTENSIONS: FrozenSet[str] = frozenset({"png", "jpg", "jpeg"})
     DEFAULT_MAX_DIMENSION = 2000
     DEFAULT_QUALITY = 95
 
@@ -43,6 +60,19 @@ class ImageService:
         self.imgbb_api_key = imgbb_api_key
         self.logger = get_logger(__name__)
 
+        # Fallback host for public URLs when the request has no Host header (read once)
+        self.public_domain = os.environ.get("RAILWAY_PUBLIC_DOMAIN", "taptolook.net")
+
+        # Source path -> preprocess_image() result, so /api/tryon reuses the work
+        # done at upload time without touching the files again
+        self._preprocessed = TTLCache(ttl_seconds=_PREPROCESSED_TTL_SECONDS)
+
+        # JPEG decode/encode dominates preprocessing; make a non-turbo libjpeg build visible
+        self.logger.info(
+            f"Pillow {PIL.__version__}: libjpeg-turbo "
+            f"{'enabled' if features.check_feature('libjpeg_turbo') else 'NOT available'}"
+        )
+
     def validate_file(self, filename: str) -> bool:
         """
         Check if filename has an allowed extension.
@@ -53,10 +83,21 @@ class ImageService:
         Returns:
             True if extension is allowed, False otherwise
         """
-        if "." not in filename:
-            return False
-        extension = filename.rsplit(".", 1)[1].lower()
-        return extension in self.ALLOWED_EXTENSIONS
+        return self.allowed_extension(filename) is not None
+
+    def allowed_extension(self, filename: str) -> Optional[str]:
+        """
+        Get the lowercased extension of filename if it is allowed.
+
+        Args:
+            filename: Name of the file
+
+        Returns:
+            Extension without the dot, or None if missing or not allowed
+        """
+        _, dot, extension = filename.rpartition(".")
+        extension = extension.lower()
+        return extension if dot and extension in self.ALLOWED_EXTENSIONS else None
 
     def validate_image_quality(self, image_path: str) -> Tuple[bool, List[str]]:
         """
@@ -74,60 +115,113 @@ class ImageService:
         Returns:
             Tuple of (is_valid: bool, warnings: List[str])
         """
-        warnings = []
+        return self._validate_image(image_path, image_path)
+
+    def validate_image_quality_stream(self, stream: IO[bytes]) -> Tuple[bool, List[str]]:
+        """
+        Validate image quality directly from a file-like object (no temp file).
 
+        Same checks as validate_image_quality().
+
+        Args:
+            stream: Readable binary stream (e.g. FileStorage.stream)
+
+        Returns:
+            Tuple of (is_valid: bool, warnings: List[str])
+        """
+        return self._validate_image(stream, "<stream>")
+
+    def _validate_image(self, source, label: str) -> Tuple[bool, List[str]]:
+        """Run quality checks on an image path or stream (label is used for logging)."""
         try:
-            img = Image.open(image_path)
-            width, height = img.size
+            return True, self._quality_warnings(Image.open(source))
 
-            # Check minimum resolution
-            if width < 512 or height < 512:
-                warnings.append("Низкое разрешение - рекомендуется минимум 512px")
-
-            # Check if image is too large
-            if height > 2000 or width > 2000:
-                warnings.append("Изображение будет автоматически уменьшено до 2000px")
-
-            # Check aspect ratio
-            aspect_ratio = width / height
-            supported_ratios = {
-                "1:1": 1.0,
-                "3:4": 0.75,
-                "4:3": 1.33,
-                "9:16": 0.56,
-                "16:9": 1.78,
-                "2:3": 0.67,
-                "3:2": 1.5,
-                "4:5": 0.8,
-                "5:4": 1.25,
-            }
-
-            # Find closest supported ratio
-            closest_ratio = min(supported_ratios.values(), key=lambda x: abs(x - aspect_ratio))
-            if abs(aspect_ratio - closest_ratio) > 0.15:
-                warnings.append("Необычное соотношение сторон - может повлиять на качество")
-
-            # Check brightness (simple histogram analysis)
-            grayscale = img.convert("L")
-            histogram = grayscale.histogram()
-            pixels = sum(histogram)
-            brightness = sum(i * histogram[i] for i in range(256)) / pixels
-
-            if brightness < 80:
-                warnings.append("Изображение слишком темное - улучшите освещение")
-            elif brightness > 200:
-                warnings.append("Изображение слишком яркое - проверьте экспозицию")
-
-            self.logger.info(
-                f"Image validation: {width}x{height}, brightness: {brightness:.1f}, "
-                f"warnings: {len(warnings)}"
-            )
+        except Exception as e:
+            self.logger.error(f"Failed to validate {label}: {e}", exc_info=True)
+            return False, ["Не удалось проанализировать изображение"]
 
-            return True, warnings
+    def _quality_warnings(self, img: Image.Image, size: Optional[Tuple[int, int]] = None) -> List[str]:
+        """Quality checks of validate_image_quality() on an opened image (size: before any draft())."""
+        warnings = []
+        width, height = size or img.size
+
+        # Check minimum resolution
+        if width < 512 or height < 512:
+            warnings.append("Низкое разрешение - рекомендуется минимум 512px")
+
+        # Check if image is too large
+        if height > 2000 or width > 2000:
+            warnings.append("Изображение будет автоматически уменьшено до 2000px")
+
+        # Check aspect ratio
+        aspect_ratio = width / height
+        supported_ratios = {
+            "1:1": 1.0,
+            "3:4": 0.75,
+            "4:3": 1.33,
+            "9:16": 0.56,
+            "16:9": 1.78,
+            "2:3": 0.67,
+            "3:2": 1.5,
+            "4:5": 0.8,
+            "5:4": 1.25,
+        }
+
+        # Find closest supported ratio
+        closest_ratio = min(supported_ratios.values(), key=lambda x: abs(x - aspect_ratio))
+        if abs(aspect_ratio - closest_ratio) > 0.15:
+            warnings.append("Необычное соотношение сторон - может повлиять на качество")
+
+        # Check brightness (mean luminance, computed in C by ImageStat)
+        brightness = ImageStat.Stat(img.convert("L")).mean[0]
+
+        if brightness < 80:
+            warnings.append("Изображение слишком темное - улучшите освещение")
+        elif brightness > 200:
+            warnings.append("Изображение слишком яркое - проверьте экспозицию")
+
+        self.logger.info(
+            f"Image validation: {width}x{height}, brightness: {brightness:.1f}, "
+            f"warnings: {len(warnings)}"
+        )
+
+        return warnings
+
+    def analyze_and_preprocess(
+        self, image_path: str, max_dimension: int = DEFAULT_MAX_DIMENSION, quality: int = DEFAULT_QUALITY
+    ) -> Tuple[str, bool, List[str]]:
+        """
+        Validate and preprocess an image with a single decode.
+
+        Runs the checks of validate_image_quality() and the conversion of
+        preprocess_image() on the same decoded image. The optimized file is
+        picked up by a later preprocess_image() call for the same path.
+
+        Args:
+            image_path: Path to input image
+            max_dimension: Maximum allowed dimension (default: 2000)
+            quality: JPEG quality (default: 95)
 
+        Returns:
+            Tuple of (preprocessed_path: str, is_valid: bool, warnings: List[str])
+        """
+        try:
+            img = Image.open(image_path)
+            source_size = img.size
+            self._draft(img, max_dimension)
+            img.load()
+            warnings = self._quality_warnings(img, source_size)
         except Exception as e:
             self.logger.error(f"Failed to validate {image_path}: {e}", exc_info=True)
-            return False, ["Не удалось проанализировать изображение"]
+            return image_path, False, ["Не удалось проанализировать изображение"]
+
+        output_path = self._preprocess_opened(img, image_path, max_dimension, quality, source_size)
+        if output_path is None:
+            # Failed conversion is not cached: the next call tries again
+            return image_path, True, warnings
+
+        self._preprocessed.set((image_path, max_dimension, quality), output_path)
+        return output_path, True, warnings
 
     def preprocess_image(
         self, image_path: str, max_dimension: int = DEFAULT_MAX_DIMENSION, quality: int = DEFAULT_QUALITY
@@ -136,6 +230,9 @@ class ImageService:
         Preprocess image for optimal quality.
 
         Steps:
+        - Reuse the result of an earlier call / analyze_and_preprocess() (in this
+          process, or the optimized file another worker wrote)
+        - Return the input as-is if it is already an upright RGB JPEG within limits
         - Convert RGBA/LA/P to RGB (with white background)
         - Resize if any dimension exceeds max_dimension (maintaining aspect ratio)
         - Save as optimized JPEG with specified quality
@@ -149,13 +246,92 @@ class ImageService:
             quality: JPEG quality (default: 95)
 
         Returns:
-            Path to preprocessed image (original_name_optimized.jpg)
-
-        Raises:
-            ValueError: If final dimensions exceed max_dimension
+            Path to preprocessed image (original_name_optimized.jpg), or
+            image_path if no conversion is needed
         """
+        cache_key = (image_path, max_dimension, quality)
+        cached = self._preprocessed.get(cache_key)
+        if cached:
+            return cached
+
+        output_path = self._optimized_path(image_path)
+        try:
+            # Written atomically, so an existing file is complete
+            if os.stat(output_path).st_mtime_ns >= os.stat(image_path).st_mtime_ns:
+                self.logger.info(f"Reusing optimized image: {output_path}")
+                self._preprocessed.set(cache_key, output_path)
+                return output_path
+        except OSError:
+            pass
+
         try:
+            # Image.open only parses the header; pixels are decoded on first use
             img = Image.open(image_path)
+        except Exception as e:
+            self.logger.error(f"Failed to preprocess {image_path}: {e}", exc_info=True)
+            return image_path
+
+        output_path = self._preprocess_opened(img, image_path, max_dimension, quality)
+        if output_path is None:
+            # Failed conversion is not cached: the next call tries again
+            return image_path
+
+        self._preprocessed.set(cache_key, output_path)
+        return output_path
+
+    @staticmethod
+    def _optimized_path(image_path: str) -> str:
+        """Output path of preprocess_image() for image_path."""
+        return image_path.rsplit(".", 1)[0] + "_optimized.jpg"
+
+    @staticmethod
+    def _draft(img: Image.Image, max_dimension: int) -> None:
+        """
+        Let libjpeg decode an oversized JPEG at 1/2, 1/4 or 1/8 scale.
+
+        Must run before pixels are loaded (no-op afterwards and for other
+        formats). The scale is chosen so both sides stay >= the final
+        resize target, which LANCZOS then reaches exactly.
+        """
+        width, height = img.size
+        if img.format != "JPEG" or max(width, height) <= max_dimension:
+            return
+
+        ratio = min(max_dimension / width, max_dimension / height)
+        img.draft("RGB", (int(width * ratio), int(height * ratio)))
+
+    def _preprocess_opened(
+        self,
+        img: Image.Image,
+        image_path: str,
+        max_dimension: int,
+        quality: int,
+        source_size: Optional[Tuple[int, int]] = None,
+    ) -> Optional[str]:
+        """
+        Convert/resize an opened image and save it as optimized JPEG (see preprocess_image).
+
+        source_size is the file's own size if img was already draft()-ed.
+        Returns image_path if no conversion is needed, and None if preprocessing
+        fails (including a result that still exceeds max_dimension); callers
+        then fall back to the original without caching the failure.
+        """
+        try:
+            source_width, source_height = source_size or img.size
+
+            # Already a small RGB JPEG: skip the decode + re-encode round trip. Images with
+            # an EXIF orientation still go through it (re-encoding drops the tag).
+            if (
+                img.format == "JPEG"
+                and img.mode == "RGB"
+                and max(source_width, source_height) <= max_dimension
+                and img.getexif().get(_EXIF_ORIENTATION, 1) == 1
+            ):
+                self.logger.info(f"Image {source_width}x{source_height} JPEG needs no preprocessing: {image_path}")
+                return image_path
+
+            # Shrink-on-load for big JPEGs (no-op if already decoded)
+            self._draft(img, max_dimension)
 
             # Convert RGBA to RGB if needed
             if img.mode in ("RGBA", "LA", "P"):
@@ -183,7 +359,9 @@ class ImageService:
                 if new_height > max_dimension:
                     new_height = max_dimension
 
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+                # reducing_gap: integer box pre-shrink, then LANCZOS only for the last <3x
+                # (libvips-style; visually the same as a full LANCZOS pass, much cheaper)
+                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS, reducing_gap=_REDUCING_GAP)
                 self.logger.info(
                     f"Resized image from {original_size[0]}x{original_size[1]} to {new_width}x{new_height}"
                 )
@@ -197,9 +375,19 @@ class ImageService:
             else:
                 self.logger.info(f"Image size {width}x{height} is within limits (max: {max_dimension})")
 
-            # Save as optimized JPEG
-            output_path = image_path.rsplit(".", 1)[0] + "_optimized.jpg"
-            img.save(output_path, "JPEG", quality=quality, optimize=True)
+            # Save as optimized JPEG (temp file + rename, so a concurrent
+            # preprocess_image() never sees a partially written file)
+            output_path = self._optimized_path(image_path)
+            tmp_fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(output_path), prefix=os.path.basename(output_path) + ".", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(tmp_fd, "wb") as tmp_file:
+                    img.save(tmp_file, "JPEG", quality=quality, optimize=True)
+                os.replace(tmp_path, output_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
 
             # Verify final dimensions
             final_img = Image.open(output_path)
@@ -215,13 +403,15 @@ class ImageService:
 
         except Exception as e:
             self.logger.error(f"Failed to preprocess {image_path}: {e}", exc_info=True)
-            # Return original path if preprocessing fails (but this might cause API errors)
-            return image_path
+            return None
 
     def image_to_base64(self, image_path: str) -> str:
         """
         Convert image file to base64 string.
 
+        The file is encoded straight from a read-only mmap, so only the
+        base64 output is allocated (no intermediate bytes copy of the file).
+
         Args:
             image_path: Path to image file
 
@@ -229,8 +419,10 @@ class ImageService:
             Base64-encoded string
         """
         with open(image_path, "rb") as img_file:
-            img_data = base64.b64encode(img_file.read()).decode("utf-8")
-        return img_data
+            if os.fstat(img_file.fileno()).st_size == 0:
+                return ""  # mmap can't map an empty file
+            with mmap.mmap(img_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return pybase64.b64encode_as_string(mapped)
 
     def save_base64_image(self, base64_string: str, output_path: str) -> str:
         """
@@ -243,12 +435,15 @@ class ImageService:
         Returns:
             Path to saved image
         """
-        # Remove data URL prefix if present
-        if "," in base64_string:
-            base64_string = base64_string.split(",", 1)[1]
+        # Remove data URL prefix if present (it is short, so don't scan the whole payload)
+        comma = base64_string.find(",", 0, _DATA_URL_PREFIX_MAX)
+        if comma != -1:
+            base64_string = base64_string[comma + 1 :]
+
+        img_data = pybase64.b64decode(base64_string)
 
-        img_data = base64.b64decode(base64_string)
-        with open(output_path, "wb") as img_file:
+        # Unbuffered: the decoded bytes go to the OS in one write, no copy into a buffer
+        with open(output_path, "wb", buffering=0) as img_file:
             img_file.write(img_data)
         return output_path
 
@@ -278,20 +473,20 @@ class ImageService:
                 host = request_obj.headers.get("Host", "")
                 if host:
                     # Remove port if present
-                    domain = host.split(":")[0]
-                    self.logger.info(f"Detected domain from request: {domain}")
+                    domain = host.partition(":")[0]
+                    self.logger.debug("Detected domain from request: %s", domain)
             except Exception as e:
                 self.logger.warning(f"Could not get domain from request: {e}")
 
         # Fallback to environment variable or default
         if not domain:
-            domain = os.environ.get("RAILWAY_PUBLIC_DOMAIN", "taptolook.net")
-            self.logger.info(f"Using domain from environment/default: {domain}")
+            domain = self.public_domain
+            self.logger.debug("Using domain from environment/default: %s", domain)
 
         # Construct public URL for the uploaded file
         public_url = f"https://{domain}/uploads/{filename}"
 
-        self.logger.info(f"Generated public URL: {public_url}")
+        self.logger.debug("Generated public URL: %s", public_url)
 
         # Verify file exists before generating URL
         if not os.path.exists(image_path):
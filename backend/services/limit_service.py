@@ -17,6 +17,7 @@ class LimitService:
     - Check device limits (anonymous users: 3/day per device fingerprint + IP)
     - Check user limits (authenticated users: from user profile)
     - Increment limit counters
+    - Atomically consume a device generation (check + increment in one query)
     - Combine device and user limit logic
 
     Orchestrates DeviceLimitRepository and UserRepository (when available).
@@ -133,6 +134,56 @@ class LimitService:
             "limit": self.FREE_DAILY_LIMIT,
         }
 
+    def consume_device_limit(
+        self, device_fingerprint: str, ip_address: str, user_agent: str, increment: int = 1
+    ) -> Dict[str, any]:
+        """
+        Check and increment device limit in one step (anonymous users).
+
+        Replaces check_device_limit() + increment_device_limit() around a
+        generation: the usage is reserved atomically up front and can be
+        given back with increment_device_limit(..., increment=-increment)
+        if the generation fails.
+
+        Args:
+            device_fingerprint: Browser fingerprint
+            ip_address: Client IP address
+            user_agent: Browser user agent string
+            increment: How many generations to consume (default: 1)
+
+        Returns:
+            Dictionary with limit status after the attempt:
+            {
+                'can_generate': bool,  # True if usage was consumed
+                'used': int,
+                'remaining': int,
+                'limit': int
+            }
+        """
+        today = date.today()
+
+        # Ensure record exists (create or reset if date changed)
+        record = self.device_limit_repo.create_or_reset_record(device_fingerprint, ip_address, user_agent, today)
+
+        used = self.device_limit_repo.consume_if_available(
+            device_fingerprint, ip_address, today, self.FREE_DAILY_LIMIT, increment
+        )
+        consumed = used is not None
+        if not consumed:
+            used = record["generations_used"]
+
+        self.logger.info(
+            f"Device limit consume: FP={device_fingerprint[:16]}... IP={ip_address} "
+            f"Used={used}/{self.FREE_DAILY_LIMIT} consumed={consumed}"
+        )
+
+        return {
+            "can_generate": consumed,
+            "used": used,
+            "remaining": max(0, self.FREE_DAILY_LIMIT - used),
+            "limit": self.FREE_DAILY_LIMIT,
+        }
+
     def check_user_limit(self, user_id: int) -> Dict[str, any]:
         """
         Check generation limit for authenticated user.
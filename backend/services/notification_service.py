@@ -1,6 +1,8 @@
 """Notification service for Telegram alerts."""
 
-from typing import List, Optional, Tuple
+import html
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 from backend.clients.telegram_client import TelegramClient
 from backend.logger import get_logger
@@ -8,6 +10,34 @@ from backend.repositories.feedback_repository import FeedbackRepository
 
 logger = get_logger(__name__)
 
+# Maximum concurrent Telegram requests when retrying failed notifications
+RETRY_MAX_WORKERS = 4
+
+# Feedback message (HTML parse mode); user-supplied parts are escaped before formatting
+_FEEDBACK_TEMPLATE = (
+    "<b>Новый отзыв!</b>\n\n"
+    "Оценка: {stars} ({rating}/5)\n\n"
+    "Комментарий:\n{comment}\n\n"
+    "{session_line}"
+)
+
+# Star strings indexed by rating (0-5)
+_STARS = tuple("⭐" * i for i in range(6))
+
+# Batched feedback notifications: entries are joined up to Telegram's message size limit
+_TELEGRAM_MESSAGE_LIMIT = 4096
+_BATCH_SEPARATOR = "\n\n———\n\n"
+
+
+def _format_feedback(rating: int, comment: str, session_id: Optional[str]) -> str:
+    """Render one feedback as Telegram HTML."""
+    return _FEEDBACK_TEMPLATE.format(
+        stars=_STARS[rating] if 0 <= rating <= 5 else "?",
+        rating=rating,
+        comment=html.escape(comment, quote=False),
+        session_line=f"Session ID: {html.escape(session_id, quote=False)}" if session_id else "",
+    )
+
 
 class NotificationService:
     """
@@ -66,14 +96,14 @@ class NotificationService:
             self.logger.warning("Telegram client not configured - skipping notification")
             return False, "Telegram client not configured"
 
-        self.logger.info(f"Sending result notification with photo: {result_image_path}")
+        self.logger.debug("Sending result notification with photo: %s", result_image_path)
 
         success, error = self.telegram_client.send_photo(
             photo_path=result_image_path, caption=caption, max_retries=max_retries
         )
 
         if success:
-            self.logger.info("Result notification sent successfully")
+            self.logger.debug("Result notification sent successfully")
         else:
             self.logger.error(f"Result notification failed: {error}")
 
@@ -98,25 +128,64 @@ class NotificationService:
             self.logger.warning("Telegram client not configured - skipping feedback notification")
             return False, "Telegram client not configured"
 
-        # Build feedback message
-        stars = "⭐" * rating
-        message = f"<b>Новый отзыв!</b>\n\n"
-        message += f"Оценка: {stars} ({rating}/5)\n\n"
-        message += f"Комментарий:\n{comment}\n\n"
-        if session_id:
-            message += f"Session ID: {session_id}"
+        message = _format_feedback(rating, comment, session_id)
 
-        self.logger.info(f"Sending feedback notification: {rating}/5 stars")
+        self.logger.debug("Sending feedback notification: %d/5 stars", rating)
 
         success, error = self.telegram_client.send_message(text=message, max_retries=max_retries)
 
         if success:
-            self.logger.info("Feedback notification sent successfully")
+            self.logger.debug("Feedback notification sent successfully")
         else:
             self.logger.error(f"Feedback notification failed: {error}")
 
         return success, error
 
+    def send_feedback_batch_notification(
+        self, feedbacks: List[Dict], max_retries: int = 3
+    ) -> List[Tuple[bool, Optional[str]]]:
+        """
+        Send several feedbacks to Telegram in as few messages as possible.
+
+        Feedbacks are joined into messages of up to _TELEGRAM_MESSAGE_LIMIT
+        characters; a single feedback is sent exactly like
+        send_feedback_notification would.
+
+        Args:
+            feedbacks: Dicts with 'rating', 'comment' and optional 'session_id'
+            max_retries: Maximum retry attempts per message (default: 3)
+
+        Returns:
+            (success, error_message) per feedback, in input order
+        """
+        if not self.telegram_client:
+            self.logger.warning("Telegram client not configured - skipping feedback notification")
+            return [(False, "Telegram client not configured")] * len(feedbacks)
+
+        groups: List[List[str]] = []
+        group_size = 0
+        for feedback in feedbacks:
+            text = _format_feedback(feedback["rating"], feedback["comment"], feedback.get("session_id"))
+            if groups and group_size + len(_BATCH_SEPARATOR) + len(text) <= _TELEGRAM_MESSAGE_LIMIT:
+                groups[-1].append(text)
+                group_size += len(_BATCH_SEPARATOR) + len(text)
+            else:
+                groups.append([text])
+                group_size = len(text)
+
+        self.logger.info("Sending %d feedback notification(s) in %d message(s)", len(feedbacks), len(groups))
+
+        results = []
+        for group in groups:
+            success, error = self.telegram_client.send_message(
+                text=_BATCH_SEPARATOR.join(group), max_retries=max_retries
+            )
+            if not success:
+                self.logger.error(f"Feedback notification failed: {error}")
+            results.extend([(success, error)] * len(group))
+
+        return results
+
     def retry_failed_feedbacks(self, max_retries: int = 3) -> dict:
         """
         Retry sending notifications for feedback that failed to send.
@@ -152,22 +221,26 @@ class NotificationService:
 
         self.logger.info(f"Retrying {len(unsent_feedbacks)} failed feedback notifications...")
 
-        attempted = 0
+        def send(feedback: dict) -> Tuple[bool, Optional[str]]:
+            return self.send_feedback_notification(
+                rating=feedback["rating"],
+                comment=feedback["comment"],
+                session_id=feedback.get("session_id"),
+                max_retries=max_retries,
+            )
+
+        # Send concurrently (wall time ~ slowest request instead of the sum);
+        # database updates stay on the calling thread
+        with ThreadPoolExecutor(max_workers=min(RETRY_MAX_WORKERS, len(unsent_feedbacks))) as executor:
+            send_results = list(executor.map(send, unsent_feedbacks))
+
+        attempted = len(unsent_feedbacks)
         succeeded = 0
         failed = 0
         errors = []
 
-        for feedback in unsent_feedbacks:
-            attempted += 1
+        for feedback, (success, error) in zip(unsent_feedbacks, send_results):
             feedback_id = feedback["id"]
-            rating = feedback["rating"]
-            comment = feedback["comment"]
-            session_id = feedback.get("session_id")
-
-            # Try to send
-            success, error = self.send_feedback_notification(
-                rating=rating, comment=comment, session_id=session_id, max_retries=max_retries
-            )
 
             # Update database
             try:
@@ -1,6 +1,10 @@
 """Virtual try-on orchestration service."""
 
+import html
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from typing import Dict, List, Optional
 
 from flask import Request
@@ -12,9 +16,26 @@ from backend.repositories.generation_repository import GenerationRepository
 from backend.services.image_service import ImageService
 from backend.services.limit_service import LimitService
 from backend.services.notification_service import NotificationService
+from backend.utils.cache_helpers import user_stats_cache
 
 logger = get_logger(__name__)
 
+# Person images of one request are generated concurrently (up to 4 per upload).
+# Each task mostly waits on NanoBanana polling, so threads are enough here. The pool
+# is shared by all request threads of the worker: size it for several concurrent
+# try-ons, not just one, or requests queue behind each other's images. Tasks never
+# touch the database, so this size is independent of the DB connection pool.
+_TRYON_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="TryonImage")
+
+# Telegram caption for a new result (HTML parse mode); request-supplied parts are escaped
+_RESULT_CAPTION_TEMPLATE = (
+    "🎨 <b>Новый результат примерки</b>\n\n"
+    "📸 Оригинал: {original}\n"
+    "👕 Категория: {category}\n"
+    "🌐 IP: {ip}\n"
+    "⏰ {time}"
+)
+
 
 class TryonService:
     """
@@ -71,20 +92,21 @@ class TryonService:
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None,
         request_obj: Optional[Request] = None,
+        inline_result: bool = False,
     ) -> Dict:
         """
         Process virtual try-on for multiple person images.
 
         Complete workflow:
-        1. Check limits (device or user)
-        2. Validate inputs
-        3. Process each person image:
-           - Preprocess images
+        1. Validate inputs
+        2. Check limits (user) or atomically reserve a generation (device)
+        3. Process person images concurrently:
+           - Preprocess images (garment once)
            - Generate public URLs
            - Call NanoBanana API
            - Process result
            - Send Telegram notification
-        4. Increment limits
+        4. Increment user limit / release device reservation if all failed
         5. Track generation
         6. Return results
 
@@ -97,6 +119,7 @@ class TryonService:
             ip_address: Client IP address (for anonymous)
             user_agent: Browser user agent (for anonymous)
             request_obj: Flask request object (for URL generation)
+            inline_result: Also return each result as a base64 data URL ("result_image")
 
         Returns:
             Dictionary with results:
@@ -116,13 +139,32 @@ class TryonService:
             f"user_id={user_id if user_id else 'anonymous'}"
         )
 
-        # 1. Check limits BEFORE processing
-        limit_status = self.limit_service.can_generate(
-            user_id=user_id,
-            device_fingerprint=device_fingerprint,
-            ip_address=ip_address,
-            user_agent=user_agent,
-        )
+        # 1. Validate inputs (before touching limits, so bad requests cost nothing)
+        if not person_images or not garment_image:
+            raise ValueError("Person images and garment image are required")
+
+        if not os.path.exists(garment_image):
+            raise ValueError(f"Garment image not found: {garment_image}")
+
+        # Filter out non-existent person images
+        valid_person_images = [p for p in person_images if os.path.exists(p)]
+
+        if not valid_person_images:
+            raise ValueError("No valid person images found")
+
+        self.logger.info(f"Validated inputs: {len(valid_person_images)} person images, garment image OK")
+
+        # 2. Check limits BEFORE processing. Anonymous usage is reserved here in one
+        # atomic query (check + increment) and given back if no image succeeds.
+        device_reserved = not (user_id and self.limit_service.user_repository)
+
+        if device_reserved:
+            if not all([device_fingerprint, ip_address, user_agent]):
+                raise ValueError("Device fingerprint, IP, and user agent required for anonymous users")
+            limit_status = self.limit_service.consume_device_limit(device_fingerprint, ip_address, user_agent)
+            limit_status["user_type"] = "anonymous"
+        else:
+            limit_status = self.limit_service.can_generate(user_id=user_id)
 
         if not limit_status["can_generate"]:
             user_type = "authenticated" if user_id else "anonymous"
@@ -141,53 +183,63 @@ class TryonService:
             f"user_type={limit_status.get('user_type', 'unknown')}"
         )
 
-        # 2. Validate inputs
-        if not person_images or not garment_image:
-            raise ValueError("Person images and garment image are required")
-
-        if not os.path.exists(garment_image):
-            raise ValueError(f"Garment image not found: {garment_image}")
-
-        # Filter out non-existent person images
-        valid_person_images = [p for p in person_images if os.path.exists(p)]
-
-        if not valid_person_images:
-            raise ValueError("No valid person images found")
+        # 3. Process person images concurrently (garment is shared, prepare it once)
+        try:
+            if request_obj is not None and hasattr(request_obj, "_get_current_object"):
+                # Worker threads have no request context - pass the real request, not the proxy
+                request_obj = request_obj._get_current_object()
 
-        self.logger.info(f"Validated inputs: {len(valid_person_images)} person images, garment image OK")
+            garment_optimized = self.image_service.preprocess_image(garment_image, max_dimension=2000, quality=95)
+            garment_url = self.image_service.generate_public_url(garment_optimized, request_obj)
 
-        # 3. Process each person image
-        results = []
-
-        for person_image in valid_person_images:
-            try:
-                result = self._process_single_image(
+            futures = [
+                _TRYON_POOL.submit(
+                    self._process_single_image,
                     person_image=person_image,
-                    garment_image=garment_image,
+                    garment_url=garment_url,
                     garment_category=garment_category,
                     request_obj=request_obj,
                     ip_address=ip_address,
+                    inline_result=inline_result,
                 )
-                results.append(result)
+                for person_image in valid_person_images
+            ]
 
-                self.logger.info(f"Successfully processed: {os.path.basename(person_image)}")
+            results = []
 
-            except Exception as e:
-                error_result = self._handle_processing_error(person_image, e)
-                results.append(error_result)
+            for person_image, future in zip(valid_person_images, futures):
+                try:
+                    result = future.result()
+                    results.append(result)
 
-        # 4. Increment limits (only if at least one success)
+                    self.logger.info(f"Successfully processed: {os.path.basename(person_image)}")
+
+                except Exception as e:
+                    error_result = self._handle_processing_error(person_image, e)
+                    results.append(error_result)
+        except Exception:
+            if device_reserved:
+                self._release_device_limit(device_fingerprint, ip_address, user_agent)
+            raise
+
+        # 4. Update limits: authenticated users are incremented only if at least one
+        # image succeeded; the anonymous reservation is released if none did
         successful_results = [r for r in results if "error" not in r]
 
-        if successful_results:
+        if device_reserved:
+            if successful_results:
+                updated_limit = {
+                    "success": True,
+                    "used": limit_status["used"],
+                    "remaining": limit_status["remaining"],
+                    "limit": limit_status["limit"],
+                    "user_type": "anonymous",
+                }
+            else:
+                updated_limit = self._release_device_limit(device_fingerprint, ip_address, user_agent) or limit_status
+        elif successful_results:
             try:
-                updated_limit = self.limit_service.increment_limit(
-                    user_id=user_id,
-                    device_fingerprint=device_fingerprint,
-                    ip_address=ip_address,
-                    user_agent=user_agent,
-                    increment=1,  # Increment by 1 regardless of how many person images
-                )
+                updated_limit = self.limit_service.increment_limit(user_id=user_id, increment=1)
 
                 self.logger.info(
                     f"Limit incremented: {updated_limit['used']}/{updated_limit['limit']}, "
@@ -253,6 +305,10 @@ class TryonService:
                 self.logger.info(f"Tracked {len(successful_results)} generations in database")
             except Exception as e:
                 self.logger.error(f"Failed to track generation: {e}")
+            finally:
+                if user_id:
+                    # New generations / R2 uploads change the user's dashboard stats
+                    user_stats_cache.delete(user_id)
 
         # 6. Build response
         response = {
@@ -275,27 +331,32 @@ class TryonService:
     def _process_single_image(
         self,
         person_image: str,
-        garment_image: str,
+        garment_url: str,
         garment_category: str,
         request_obj: Optional[Request],
         ip_address: Optional[str],
+        inline_result: bool = False,
     ) -> Dict:
         """
         Process a single person image with garment.
 
+        Runs on a _TRYON_POOL thread, so request_obj must be a real Request
+        (not the flask.request proxy).
+
         Args:
             person_image: Person image path
-            garment_image: Garment image path
+            garment_url: Public URL of the preprocessed garment image
             garment_category: Garment category
             request_obj: Flask request object (for URL generation)
             ip_address: Client IP address (for Telegram caption)
+            inline_result: Include the base64 data URL (skipped by default)
 
         Returns:
             Result dictionary:
             {
                 'original': str,        # Original filename
                 'result_path': str,     # Path to result image
-                'result_image': str,    # Base64 data URL
+                'result_image': str,    # Base64 data URL (only if inline_result)
                 'result_url': str,      # Public URL
                 'result_filename': str  # Result filename
             }
@@ -305,19 +366,15 @@ class TryonService:
         """
         self.logger.info(f"Processing image: {os.path.basename(person_image)}")
 
-        # Preprocess images
+        # Preprocess person image (garment is prepared once in process_tryon)
         person_optimized = self.image_service.preprocess_image(person_image, max_dimension=2000, quality=95)
-        garment_optimized = self.image_service.preprocess_image(garment_image, max_dimension=2000, quality=95)
 
-        # Generate public URLs
+        # Generate public URL
         person_url = self.image_service.generate_public_url(person_optimized, request_obj)
-        garment_url = self.image_service.generate_public_url(garment_optimized, request_obj)
 
         self.logger.info(f"Generated URLs: person={person_url}, garment={garment_url}")
 
         # Generate result filename
-        import time
-
         timestamp = int(time.time())
         result_filename = f"result_{timestamp}_{os.path.basename(person_image)}"
         result_path = os.path.join(self.result_folder, result_filename)
@@ -341,19 +398,15 @@ class TryonService:
         # Generate result URL
         result_url = self.image_service.generate_public_url(result_path, request_obj)
 
-        # Convert result to base64 for frontend
-        result_base64 = self.image_service.image_to_base64(result_path)
-
         # Send Telegram notification (if configured)
         if self.notification_service and self.notification_service.is_enabled():
             try:
-                from datetime import datetime
-
-                caption = f"🎨 <b>Новый результат примерки</b>\n\n"
-                caption += f"📸 Оригинал: {os.path.basename(person_image)}\n"
-                caption += f"👕 Категория: {garment_category}\n"
-                caption += f"🌐 IP: {ip_address or 'Unknown'}\n"
-                caption += f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                caption = _RESULT_CAPTION_TEMPLATE.format(
+                    original=html.escape(os.path.basename(person_image), quote=False),
+                    category=html.escape(str(garment_category), quote=False),
+                    ip=html.escape(ip_address or "Unknown", quote=False),
+                    time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                )
 
                 success, error = self.notification_service.send_result_notification(
                     result_image_path=result_path, caption=caption, max_retries=3
@@ -368,14 +421,41 @@ class TryonService:
                 self.logger.warning(f"Error sending Telegram notification: {e}")
                 # Don't fail the request if Telegram send fails
 
-        # Return result
-        return {
+        # Return result (clients load the image from result_url / result_filename)
+        result = {
             "original": os.path.basename(person_image),
             "result_path": result_path,
-            "result_image": f"data:image/png;base64,{result_base64}",
             "result_url": result_url,
             "result_filename": result_filename,
         }
+        if inline_result:
+            result["result_image"] = f"data:image/png;base64,{self.image_service.image_to_base64(result_path)}"
+
+        return result
+
+    def _release_device_limit(
+        self, device_fingerprint: str, ip_address: str, user_agent: str
+    ) -> Optional[Dict]:
+        """
+        Give back a generation reserved by consume_device_limit().
+
+        Args:
+            device_fingerprint: Browser fingerprint
+            ip_address: Client IP address
+            user_agent: Browser user agent
+
+        Returns:
+            Updated limit status, or None if the release failed
+        """
+        try:
+            updated_limit = self.limit_service.increment_device_limit(
+                device_fingerprint, ip_address, user_agent, increment=-1
+            )
+            updated_limit["user_type"] = "anonymous"
+            return updated_limit
+        except Exception as e:
+            self.logger.warning(f"Failed to release reserved device limit: {e}")
+            return None
 
     def _handle_processing_error(self, person_image: str, error: Exception) -> Dict:
         """
@@ -7,21 +7,42 @@ Shared utilities that don't fit into specific layers:
 - File operations
 - URL generation
 - Database transaction helpers
+- In-process TTL caches
 - Common helpers
 """
 
-from backend.utils.db_helpers import db_transaction
-from backend.utils.file_helpers import cleanup_old_files, start_cleanup_scheduler
+from backend.utils.cache_helpers import TTLCache, user_stats_cache
+from backend.utils.db_helpers import (
+    ScopedConnection,
+    db_transaction,
+    execute_prepared,
+    get_db_connection,
+    init_db_pool,
+    put_db_connection,
+)
+from backend.utils.file_helpers import cleanup_old_files, save_uploaded_file, start_cleanup_scheduler
+from backend.utils.json_provider import OrjsonProvider
 from backend.utils.request_helpers import get_client_ip
 from backend.utils.security_helpers import mask_sensitive_value
 from backend.utils.validators import ALLOWED_EXTENSIONS, is_allowed_file
 
 __all__ = [
+    # Caching
+    "TTLCache",
+    "user_stats_cache",
     # Database operations
+    "ScopedConnection",
     "db_transaction",
+    "execute_prepared",
+    "get_db_connection",
+    "init_db_pool",
+    "put_db_connection",
     # File operations
     "cleanup_old_files",
+    "save_uploaded_file",
     "start_cleanup_scheduler",
+    # JSON serialization
+    "OrjsonProvider",
     # Request handling
     "get_client_ip",
     # Security
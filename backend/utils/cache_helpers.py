@@ -0,0 +1,80 @@
+"""In-process caching utilities."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Small thread-safe cache whose entries expire after a fixed TTL.
+
+    Entries are per process (one cache per gunicorn worker), so callers that
+    invalidate on writes should still keep the TTL short: other workers only
+    see the change once their entry expires.
+    """
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 1024):
+        """
+        Initialize cache.
+
+        Args:
+            ttl_seconds: How long an entry stays valid
+            maxsize: Maximum number of entries (oldest are evicted first)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value for ttl_seconds.
+
+        Args:
+            key: Cache key
+            value: Value to cache (treated as read-only by callers)
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """
+        Remove a key (no-op if missing).
+
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+
+# Per-user try-on stats payloads (GET /api/user/tryons/stats), keyed by user_id.
+# Invalidated when a user's generations, favorites or R2 storage change.
+user_stats_cache = TTLCache(ttl_seconds=60)
@@ -1,11 +1,18 @@
 """
 Database transaction helpers for safe PostgreSQL operations.
 
-Provides context managers and utilities to prevent "current transaction is aborted" errors.
+Provides context managers and utilities to prevent "current transaction is aborted" errors,
+a per-process connection pool for request handlers, and ScopedConnection, the
+connection object shared by repositories and services (each thread gets its own
+pooled connection behind it).
 """
 
+import threading
 from contextlib import contextmanager
-from typing import Any, Callable, Optional, TypeVar
+from typing import Any, Callable, Optional, Sequence, TypeVar
+
+from psycopg2.extensions import connection as PgConnection
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 
 from backend.logger import get_logger
 
@@ -13,6 +20,178 @@ logger = get_logger(__name__)
 
 T = TypeVar("T")
 
+# Request connection pool (one per gunicorn worker process), created by init_db_pool()
+_pool: Optional[ThreadedConnectionPool] = None
+
+# ThreadedConnectionPool raises PoolError as soon as it is exhausted; checkouts
+# wait on this semaphore (one slot per connection) for up to _POOL_WAIT_SECONDS instead
+_pool_slots: Optional[threading.BoundedSemaphore] = None
+_POOL_WAIT_SECONDS = 10
+
+# Connection checked out by the current thread and how many holders share it,
+# so nested get_db_connection()/ScopedConnection use costs one pool slot per thread
+_local = threading.local()
+
+
+class PreparedConnection(PgConnection):
+    """psycopg2 connection that remembers which named statements it has prepared."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+
+def init_db_pool(dsn: str, minconn: int, maxconn: int) -> ThreadedConnectionPool:
+    """
+    Create the process-wide connection pool.
+
+    Connections are opened once and reused, so request handlers don't pay
+    for a TCP/TLS/auth handshake per request.
+
+    Args:
+        dsn: PostgreSQL connection string
+        minconn: Connections opened up front
+        maxconn: Maximum simultaneously checked-out connections
+
+    Returns:
+        The created pool
+    """
+    global _pool, _pool_slots
+    if _pool is not None:
+        _pool.closeall()
+    _pool = ThreadedConnectionPool(minconn, maxconn, dsn, connection_factory=PreparedConnection)
+    _pool_slots = threading.BoundedSemaphore(maxconn)
+    logger.info(f"[DB] Connection pool ready (min={minconn}, max={maxconn})")
+    return _pool
+
+
+def get_db_connection():
+    """
+    Check a connection out of the pool.
+
+    Must be returned with put_db_connection() (use try/finally). A thread that
+    already holds a connection (e.g. through ScopedConnection) gets that same
+    connection back instead of a second pool slot. When every connection is
+    checked out, waits up to _POOL_WAIT_SECONDS for one to be returned.
+
+    Returns:
+        psycopg2 connection, or None if the pool is not initialized
+
+    Raises:
+        PoolError: If no connection became free in time
+    """
+    if _pool is None:
+        return None
+
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        if not _pool_slots.acquire(timeout=_POOL_WAIT_SECONDS):
+            raise PoolError(f"no database connection available after {_POOL_WAIT_SECONDS}s")
+        try:
+            conn = _pool.getconn()
+        except Exception:
+            _pool_slots.release()
+            raise
+        _local.conn = conn
+        _local.holders = 0
+    _local.holders += 1
+    return conn
+
+
+def put_db_connection(db_connection) -> None:
+    """
+    Return a connection to the pool.
+
+    Any open transaction is rolled back by the pool, so handlers must commit
+    their writes before returning the connection. The connection only goes
+    back once every holder on the thread has returned it.
+
+    Args:
+        db_connection: Connection from get_db_connection()
+    """
+    if _pool is None or db_connection is None:
+        return
+
+    if db_connection is getattr(_local, "conn", None):
+        _local.holders -= 1
+        if _local.holders > 0:
+            return
+        _local.conn = None
+    _pool.putconn(db_connection)
+    _pool_slots.release()
+
+
+class ScopedConnection:
+    """
+    Connection object for repositories and services, backed by the pool.
+
+    Exposes the cursor()/commit()/rollback() subset they use, so it is passed
+    wherever a psycopg2 connection used to be shared. The first cursor() on a
+    thread checks a pooled connection out for that thread; release() returns it
+    (called on app context teardown, and by background tasks when they finish).
+    Concurrent requests therefore never share a transaction.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = get_db_connection()
+            if conn is None:
+                raise RuntimeError("Database pool is not initialized")
+            self._local.conn = conn
+        return conn
+
+    def cursor(self, *args: Any, **kwargs: Any):
+        """Open a cursor on this thread's connection (checking one out if needed)."""
+        return self._connection().cursor(*args, **kwargs)
+
+    def commit(self) -> None:
+        """Commit this thread's transaction (no-op if it holds no connection)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.commit()
+
+    def rollback(self) -> None:
+        """Roll back this thread's transaction (no-op if it holds no connection)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.rollback()
+
+    def release(self) -> None:
+        """Return this thread's connection to the pool, rolling back uncommitted work."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            put_db_connection(conn)
+
+
+def execute_prepared(cursor, name: str, sql: str, params: Sequence[Any]) -> None:
+    """
+    Execute a server-side prepared statement, preparing it on first use.
+
+    The statement is parsed and planned once per pooled connection instead
+    of on every call. Prepared statements are session-level, so they survive
+    rollbacks and pool check-in/check-out.
+
+    Args:
+        cursor: Cursor of a connection from get_db_connection()
+        name: Statement name (constant identifier, not user input)
+        sql: Statement text using $1, $2, ... placeholders
+        params: Parameter values, in placeholder order
+    """
+    prepared = cursor.connection.prepared_statements
+    if name not in prepared:
+        cursor.execute(f"PREPARE {name} AS {sql}")
+        prepared.add(name)
+
+    if params:
+        cursor.execute(f"EXECUTE {name}({', '.join(['%s'] * len(params))})", tuple(params))
+    else:
+        cursor.execute(f"EXECUTE {name}")
+
 
 @contextmanager
 def db_transaction(db_connection):
@@ -0,0 +1,65 @@
+"""orjson-backed JSON provider for Flask."""
+
+from typing import Any, Union
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+# Naive datetimes are UTC (matches Flask's default http_date handling);
+# non-str keys (e.g. a None category) are allowed like in stdlib json
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes with orjson instead of stdlib json.
+
+    Installed app-wide (app.json = OrjsonProvider(app)), so jsonify() and
+    request.get_json() use it everywhere. datetime/date/UUID are serialized
+    natively (ISO 8601); anything orjson can't handle (Decimal, __html__,
+    dataclasses with custom types) falls back to DefaultJSONProvider.default.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Serialize obj to a JSON string.
+
+        Args:
+            obj: Object to serialize
+            **kwargs: stdlib json options; only indent is honoured (2 spaces)
+
+        Returns:
+            JSON string
+        """
+        option = _ORJSON_OPTIONS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        """
+        Deserialize JSON data.
+
+        Args:
+            s: JSON text or bytes
+            **kwargs: Ignored (stdlib json options)
+
+        Returns:
+            Deserialized object
+        """
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """
+        Build a JSON response (what jsonify() returns).
+
+        Writes orjson's bytes straight into the body, skipping the str
+        round-trip of the default implementation.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        option = _ORJSON_OPTIONS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option), mimetype=self.mimetype
+        )
@@ -4,13 +4,17 @@ from typing import Optional
 
 from flask import Request
 
+# WSGI environ key used to memoize the resolved client IP for the lifetime of a request
+_CLIENT_IP_ENVIRON_KEY = "backend.client_ip"
+
 
 def get_client_ip(request_obj: Request) -> str:
     """
     Extract client IP address from Flask request.
 
     Checks X-Forwarded-For header first (for proxies/load balancers),
-    then falls back to remote_addr.
+    then X-Real-IP, then falls back to remote_addr. The result is cached in the request
+    environ so repeated calls within one request don't re-parse headers.
 
     Args:
         request_obj: Flask Request object
@@ -18,10 +22,17 @@ def get_client_ip(request_obj: Request) -> str:
     Returns:
         Client IP address as string
     """
-    if request_obj.headers.getlist("X-Forwarded-For"):
-        # Get first IP if multiple (client, proxy1, proxy2, ...)
-        ip = request_obj.headers.getlist("X-Forwarded-For")[0].split(",")[0].strip()
+    ip: Optional[str] = request_obj.environ.get(_CLIENT_IP_ENVIRON_KEY)
+    if ip is not None:
+        return ip
+
+    headers = request_obj.headers
+    forwarded_for = headers.get("X-Forwarded-For")
+    if forwarded_for:
+        # Get first IP if multiple (client, proxy1, proxy2, ...); partition stops at the first comma
+        ip = forwarded_for.partition(",")[0].strip()
     else:
-        ip = request_obj.remote_addr or "unknown"
+        ip = headers.get("X-Real-IP") or request_obj.remote_addr or "unknown"
 
+    request_obj.environ[_CLIENT_IP_ENVIRON_KEY] = ip
     return ip
@@ -1,12 +1,12 @@
 """Validation utilities for files and images."""
 
-from typing import Set
+from typing import AbstractSet, FrozenSet
 
 # Allowed image extensions
-ALLOWED_EXTENSIONS: Set[str] = {"png", "jpg", "jpeg"}
+ALLOWED_EXTENSIONS: FrozenSet[str] = frozenset({"png", "jpg", "jpeg"})
 
 
-def is_allowed_file(filename: str, allowed_extensions: Set[str] = ALLOWED_EXTENSIONS) -> bool:
+def is_allowed_file(filename: str, allowed_extensions: AbstractSet[str] = ALLOWED_EXTENSIONS) -> bool:
     """
     Check if filename has an allowed extension.
 
@@ -25,8 +25,5 @@ def is_allowed_file(filename: str, allowed_extensions: Set[str] = ALLOWED_EXTENS
         >>> is_allowed_file("noextension")
         False
     """
-    if "." not in filename:
-        return False
-
-    extension = filename.rsplit(".", 1)[1].lower()
-    return extension in allowed_extensions
+    _, dot, extension = filename.rpartition(".")
+    return bool(dot) and extension.lower() in allowed_extensions
@@ -1036,8 +1036,10 @@ function displayResults(results) {
             return;
         }
 
-        // Check if result_image exists
-        if (!result.result_image) {
+        // Result image: inline base64 (?inline=1) or served file from /api/result/
+        const resultSrc = result.result_image
+            || (result.result_filename ? `${API_URL}/api/result/${encodeURIComponent(result.result_filename)}` : null);
+        if (!resultSrc) {
             console.error(`No result image for index ${index}:`, result);
             return;
         }
@@ -1054,7 +1056,7 @@ function displayResults(results) {
         imageContainer.className = 'result-image-container';
 
         const img = document.createElement('img');
-        img.src = result.result_image;
+        img.src = resultSrc;
         img.alt = `Результат ${index + 1}`;
         img.className = 'result-image-preview';
 
@@ -1088,12 +1090,11 @@ function displayResults(results) {
         const downloadBtn = document.createElement('button');
         downloadBtn.className = 'download-btn';
         downloadBtn.innerHTML = '💾 Скачать';
-        // Always use base64 image (result_image) for instant access - no fetch delay
         // Generate filename from result_filename if available, otherwise use default
         downloadBtn.onclick = () => {
-            // Use base64 image directly for instant Web Share API - no fetch needed
+            // Image is already loaded for the preview, so the fetch is served from the browser cache
             const filename = result.result_filename || `taptolook.net_result_${index + 1}.png`;
-            downloadResult(result.result_image, index, filename);
+            downloadResult(resultSrc, index, filename);
         };
 
         const retryBtn = document.createElement('button');
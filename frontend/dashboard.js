@@ -5,6 +5,7 @@
 // State
 let tryons = [];
 let currentOffset = 0;
+let nextCursor = null;
 let hasMore = false;
 let currentFilter = 'all';
 let currentTryonId = null;
@@ -80,6 +81,7 @@ async function loadStats() {
 async function loadTryons(reset = true) {
     if (reset) {
         currentOffset = 0;
+        nextCursor = null;
         tryons = [];
     }
 
@@ -95,9 +97,19 @@ async function loadTryons(reset = true) {
     }
 
     try {
-        const response = await auth.fetchWithAuth(
-            `/api/user/tryons?limit=${LIMIT}&offset=${currentOffset}`
-        );
+        // Keyset cursor from the previous page (falls back to offset for the first page)
+        const params = new URLSearchParams({ limit: LIMIT });
+        if (nextCursor) {
+            params.set('after_created_at', nextCursor.after_created_at);
+            params.set('after_id', nextCursor.after_id);
+        } else {
+            params.set('offset', currentOffset);
+        }
+        if (currentFilter === 'favorites') {
+            params.set('favorites', '1');
+        }
+
+        const response = await auth.fetchWithAuth(`/api/user/tryons?${params}`);
 
         if (!response.ok) {
             throw new Error(`HTTP ${response.status}`);
@@ -114,6 +126,7 @@ async function loadTryons(reset = true) {
 
             hasMore = data.has_more || false;
             currentOffset += data.tryons.length;
+            nextCursor = data.next_cursor || null;
 
             renderGallery();
         }
@@ -305,7 +318,8 @@ function setupEventListeners() {
             filterBtns.forEach(b => b.classList.remove('active'));
             btn.classList.add('active');
             currentFilter = btn.dataset.filter;
-            renderGallery();
+            // Favorites are filtered server-side so paging covers all of them
+            loadTryons(true);
         });
     });
 
@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for the Virtual Try-On backend.
+
+Used by Procfile, nixpacks.toml and deployment/systemd.service:
+    gunicorn backend.app:app -c gunicorn.conf.py
+
+Threaded workers (gthread) let one worker serve several requests at once,
+so short endpoints (/api/auth/google/status, /api/fingerprint/generate)
+are not queued behind slow try-on requests.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+worker_class = "gthread"
+# Try-on requests spend almost all their time waiting on NanoBanana, so the thread
+# count is sized for in-flight requests rather than CPU cores. Each request thread
+# holds its own pooled database connection, so it never exceeds the pool size
+# (background tasks that need one briefly wait for a free connection).
+threads = min(
+    int(os.getenv("GUNICORN_THREADS", str(max(16, 2 * (os.cpu_count() or 1))))),
+    int(os.getenv("DB_POOL_MAX_CONNECTIONS", "16")),
+)
+
+timeout = 120
+
+
+def on_starting(server):
+    """Apply pending database migrations once, in the master, before any worker is forked."""
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        return
+
+    from backend.migrate import run_migrations
+
+    run_migrations(database_url)